@@ -79,6 +79,8 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'backend' / 'db.sqlite3',
+        # WAL lets dashboard reads continue from the last committed snapshot while an import writes
+        'OPTIONS': {'init_command': 'PRAGMA journal_mode=WAL;'},
     }
 }
 
@@ -133,4 +135,50 @@ STATICFILES_DIRS = [
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
 # Use WhiteNoise to serve static files in production
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
\ No newline at end of file
+STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+
+# Background imports (core/jobs.py): size of the local worker pool
+IMPORT_JOB_WORKERS = int(os.environ.get('IMPORT_JOB_WORKERS', 1))
+# Uploads above this size use the memory-bounded streaming reader, flushed in chunks of IMPORT_CHUNK_SIZE rows
+IMPORT_STREAM_THRESHOLD_MB = int(os.environ.get('IMPORT_STREAM_THRESHOLD_MB', 25))
+IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', 5000))
+# Sheets of one upload are parsed in up to this many processes (capped at the CPU count).
+# Off by default: each worker re-opens the whole workbook and the first upload pays for spawning
+# the pool, which costs more than it saves on typical three-sheet workbooks.
+IMPORT_PARSE_WORKERS = int(os.environ.get('IMPORT_PARSE_WORKERS', 1))
+
+# Shared cache. Dataset-derived entries (filter options...) are keyed by dataset generation.
+# Local memory by default; point CACHE_BACKEND / CACHE_LOCATION at Redis or memcached when
+# running several web workers.
+#
+# 'responses' holds whole analytics pages (core/caches.py SECTION 4). The local-memory backend
+# evicts least-recently-used pages one at a time once RESPONSE_CACHE_ENTRIES is reached; a
+# file-based backend (RESPONSE_CACHE_BACKEND / RESPONSE_CACHE_LOCATION) shares pages between
+# workers but evicts at random instead.
+RESPONSE_CACHE_ENTRIES = int(os.environ.get('RESPONSE_CACHE_ENTRIES', 100))
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'analytics-dashboard'),
+    },
+    'responses': {
+        'BACKEND': os.environ.get('RESPONSE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('RESPONSE_CACHE_LOCATION', 'analytics-responses'),
+        'OPTIONS': {'MAX_ENTRIES': RESPONSE_CACHE_ENTRIES, 'CULL_FREQUENCY': RESPONSE_CACHE_ENTRIES},
+    },
+}
+DATASET_CACHE_TIMEOUT = int(os.environ.get('DATASET_CACHE_TIMEOUT', 24 * 60 * 60))
+# Metric configuration is held in process memory; other workers' edits are picked up within this many seconds
+CONFIG_VERSION_CHECK_SECONDS = float(os.environ.get('CONFIG_VERSION_CHECK_SECONDS', 5))
+# Each process re-reads the dataset generation at most this often (a publish in the same process
+# is seen at once), so conditional GETs and cache hits run no version query in between.
+DATASET_VERSION_CHECK_SECONDS = float(os.environ.get('DATASET_VERSION_CHECK_SECONDS', 5))
+# Dashboard / report / leaderboard / comparison counts run on an in-memory columnar copy of the
+# Project table (core/store.py), reloaded per dataset generation. Set PROJECT_STORE=0 to query the ORM.
+PROJECT_STORE_ENABLED = os.environ.get('PROJECT_STORE', '1') == '1'
+# Analytics pages are served from the 'responses' cache for this long (keys carry the dataset
+# generation and config version, so a page is never served past the version checks above). 0 disables it.
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 60 * 60))
+# Admin edits (core/signals.py) reload caches and materialized scores in a background thread once
+# edits have been quiet for this many seconds, so saving a metric with 30 inline weights recomputes once
+SCORING_RECOMPUTE_DELAY_SECONDS = float(os.environ.get('SCORING_RECOMPUTE_DELAY_SECONDS', 2))
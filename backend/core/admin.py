@@ -1,5 +1,7 @@
 from django.contrib import admin            # type: ignore
-from .models import Project, Metric, Department, UserGroup, SuccessMetric, MetricWeight
+from .models import Project, Metric, Department, UserGroup, SuccessMetric, MetricWeight, ImportJob
+from .people import delete_projects
+from .signals import dataset_changed
 
 # --- 1. Success Metrics ---
 @admin.register(SuccessMetric)
@@ -36,6 +38,13 @@ class ProjectAdmin(admin.ModelAdmin):
     search_fields = ('project_code', 'project_name', 'sales_lead', 'ops_pm')
     date_hierarchy = 'login_date'
 
+    # Single deletes go through the post_delete receiver (core/signals.py); a bulk action
+    # deletes raw and starts one dataset generation for the whole selection
+    def delete_queryset(self, request, queryset):
+        project_ids = list(queryset.values_list('pk', flat=True))
+        delete_projects(queryset)
+        dataset_changed(project_ids)
+
 # --- 5. Metrics Configuration ---
 @admin.register(Metric)
 class MetricAdmin(admin.ModelAdmin):
@@ -69,4 +78,11 @@ class MetricAdmin(admin.ModelAdmin):
         weights = obj.metricweight_set.filter(factor__gt=0)
         if not weights.exists():
             return "-"
-        return ", ".join([f"{w.user_group.name} ({w.factor})" for w in weights])
\ No newline at end of file
+        return ", ".join([f"{w.user_group.name} ({w.factor})" for w in weights])
+
+# --- 6. Data Imports ---
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'file_name', 'status', 'stage', 'rows_total', 'created_count', 'updated_count', 'removed_count', 'no_changes', 'created_at', 'finished_at')
+    list_filter = ('status', 'mode', 'no_changes')
+    readonly_fields = [f.name for f in ImportJob._meta.fields]
@@ -0,0 +1,249 @@
+# core/caches.py
+import hashlib
+import logging
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+from django.conf import settings                    # type: ignore
+from django.core.cache import cache, caches         # type: ignore
+
+from .models import Project, Department, UserGroup, SuccessMetric, Metric, MetricWeight
+from .versioning import DATASET, CONFIG, get_version
+from .people import people_by_role
+
+TEST_PROJECT_CODE = "PS-02AUG23-BB1_TEST-SOMERSET-01"
+
+# Dropdown key (people_opts in the templates) -> Project field
+PEOPLE_OPTION_FIELDS = {
+    'm_head': 'm_head', 'm_lead': 'm_lead',
+    's_head': 'sales_head', 's_lead': 'sales_lead',
+    'd_dh': 'design_dh', 'd_dm': 'design_dm',
+    'd_id': 'design_id', 'd_3d': 'design_3d',
+    'o_head': 'ops_head', 'o_pm': 'ops_pm',
+    'o_om': 'ops_om', 'o_ss': 'ops_ss',
+    'o_mep': 'ops_mep', 'o_csc': 'ops_csc',
+    'p_head': 'p_head', 'p_exec': 'p_exec', 'p_mgr': 'p_mgr',
+    'f_head': 'f_head',
+}
+
+# Read-only copies of the configuration rows, as held by ConfigSnapshot
+MetricConfig = namedtuple('MetricConfig', [
+    'pk', 'label', 'field_name', 'department', 'stage', 'min_threshold', 'max_threshold',
+    'success_cat', 'success_color', 'visible_to', 'weights',     # weights: {user_group pk: factor}
+])
+GroupConfig = namedtuple('GroupConfig', ['pk', 'name', 'department'])
+SuccessConfig = namedtuple('SuccessConfig', ['pk', 'name', 'color'])
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# SECTION 1: DATASET-SCOPED KEYS
+# ==============================================================================
+# Keys embed the dataset generation, so a publish makes every older entry unreachable;
+# nothing has to be deleted and a stale value can never be served.
+
+def dataset_cache_key(name, generation):
+    return f"dataset:{generation}:{name}"
+
+def _timeout():
+    return getattr(settings, 'DATASET_CACHE_TIMEOUT', 24 * 60 * 60)
+
+# ==============================================================================
+# SECTION 2: FILTER DROPDOWN OPTIONS
+# ==============================================================================
+
+def build_filter_options():
+    """
+        People per stakeholder column, as tokenized at import (one name per entry, even where a
+        cell lists several), from the indexed assignments table + distinct SBUs. The test project
+        is left out of the people lists, as before.
+        Returns {'people': {dropdown_key: [sorted values]}, 'sbus': [sorted values]}.
+    """
+    people = people_by_role(exclude_code=TEST_PROJECT_CODE)
+    sbus = Project.objects.exclude(sbu__isnull=True).exclude(sbu='').values_list('sbu', flat=True).distinct()
+
+    return {
+        'people': {key: people[field] for key, field in PEOPLE_OPTION_FIELDS.items()},
+        'sbus': sorted(sbus),
+    }
+
+def get_filter_options(generation=None):
+    """
+        Cached build_filter_options() for the given (default: current) dataset generation.
+    """
+    if generation is None:
+        generation = get_version(DATASET)
+    key = dataset_cache_key('filter_options', generation)
+    options = cache.get(key)
+    if options is None:
+        options = build_filter_options()
+        cache.set(key, options, _timeout())
+    return options
+
+def warm_dataset_caches(generation):
+    """
+        Rebuilds the dataset-scoped caches right after a publish, so the first page view
+        of the new generation does not pay for it. Failures are logged, never raised: the
+        data is already committed and readers rebuild lazily anyway.
+    """
+    try:
+        cache.set(dataset_cache_key('filter_options', generation), build_filter_options(), _timeout())
+    except Exception:
+        logger.exception("Could not warm dataset caches for generation %s", generation)
+
+# ==============================================================================
+# SECTION 3: METRIC CONFIGURATION SNAPSHOT
+# ==============================================================================
+# Metrics, weights, groups and success categories change only through the admin, but every
+# dashboard / report / leaderboard request reads them. Each process keeps one immutable snapshot
+# stamped with the 'config' version (bumped by core/signals.py); the version is re-read at most
+# every CONFIG_VERSION_CHECK_SECONDS, so in between, config reads cost no queries at all.
+
+class ConfigSnapshot:
+    """
+        Immutable view of the scoring configuration. Metrics and groups are in primary-key order,
+        which is the order the old per-request querysets returned them in.
+    """
+    def __init__(self, version, departments, groups, success_metrics, metrics):
+        self.version = version
+        self.departments = departments          # tuple of names, sorted
+        self.groups = groups                    # tuple of GroupConfig
+        self.success_metrics = success_metrics  # tuple of SuccessConfig
+        self.metrics = metrics                  # tuple of MetricConfig
+        self.min_thresholds = MappingProxyType({m.field_name: m.min_threshold for m in metrics})
+
+    def __setattr__(self, name, value):
+        if name in self.__dict__: raise AttributeError("ConfigSnapshot is read-only")
+        super().__setattr__(name, value)
+
+    def metrics_for(self, department, stage):
+        """ Metrics of one department (case-insensitive name) and stage. """
+        department = department.lower()
+        return [m for m in self.metrics if m.department.lower() == department and m.stage == stage]
+
+    def find_metric(self, department, stage, field_name):
+        return next((m for m in self.metrics_for(department, stage) if m.field_name == field_name), None)
+
+    def find_group(self, search_term):
+        """ First group whose name contains search_term, case-insensitive (as name__icontains). """
+        search_term = search_term.lower()
+        return next((g for g in self.groups if search_term in g.name.lower()), None)
+
+    def weighted_metrics(self, group):
+        """ Metrics the group weighs above zero. """
+        return [m for m in self.metrics if m.weights.get(group.pk, 0) > 0]
+
+def build_config_snapshot(version):
+    """
+        Loads the whole configuration in five queries.
+    """
+    departments = dict(Department.objects.values_list('pk', 'name'))
+    groups = tuple(
+        GroupConfig(pk, name, departments.get(dept_id, ''))
+        for pk, name, dept_id in UserGroup.objects.order_by('pk').values_list('pk', 'name', 'department_id')
+    )
+    group_names = {g.pk: g.name for g in groups}
+    success_metrics = tuple(SuccessConfig(*row) for row in SuccessMetric.objects.order_by('pk').values_list('pk', 'name', 'color'))
+    success_by_pk = {s.pk: s for s in success_metrics}
+
+    weights, visible = {}, {}
+    for metric_id, group_id, factor in MetricWeight.objects.values_list('metric_id', 'user_group_id', 'factor'):
+        weights.setdefault(metric_id, {})[group_id] = factor
+    for metric_id, group_id in Metric.visible_to_groups.through.objects.values_list('metric_id', 'usergroup_id'):
+        visible.setdefault(metric_id, set()).add(group_names[group_id])
+
+    metrics = []
+    for m in Metric.objects.order_by('pk'):
+        success = success_by_pk.get(m.success_metric_id)
+        metrics.append(MetricConfig(
+            m.pk, m.label, m.field_name, departments.get(m.department_id, ''), m.stage,
+            m.min_threshold, m.max_threshold,
+            success.name if success else None, success.color if success else 'secondary',
+            frozenset(visible.get(m.pk, ())), MappingProxyType(weights.get(m.pk, {})),
+        ))
+
+    return ConfigSnapshot(version, tuple(sorted(departments.values())), groups, success_metrics, tuple(metrics))
+
+_config_lock = threading.Lock()
+_config_snapshot = None
+_config_checked_at = 0.0
+
+def get_config():
+    """
+        This process's ConfigSnapshot, rebuilt only when the 'config' version has moved.
+    """
+    global _config_snapshot, _config_checked_at
+    snapshot = _config_snapshot
+    interval = getattr(settings, 'CONFIG_VERSION_CHECK_SECONDS', 5)
+    if snapshot is not None and time.monotonic() - _config_checked_at < interval:
+        return snapshot
+
+    with _config_lock:
+        if _config_snapshot is not None and time.monotonic() - _config_checked_at < interval:
+            return _config_snapshot
+        version = get_version(CONFIG)
+        if _config_snapshot is None or _config_snapshot.version != version:
+            _config_snapshot = build_config_snapshot(version)
+        _config_checked_at = time.monotonic()
+        return _config_snapshot
+
+def invalidate_config():
+    """
+        Makes the next get_config() in this process re-check the version straight away
+        (other processes notice within CONFIG_VERSION_CHECK_SECONDS).
+    """
+    global _config_checked_at
+    _config_checked_at = 0.0
+
+# ==============================================================================
+# SECTION 4: ANALYTICS RESPONSE CACHE
+# ==============================================================================
+# Analytics pages are pure functions of (dataset generation, config version, normalized filters),
+# so whole responses are kept in the 'responses' cache (settings.CACHES: local memory with LRU
+# eviction by default). Stale entries are never served: both versions are part of the key.
+
+RESPONSE_CACHE = 'responses'
+
+_response_stats_lock = threading.Lock()
+_response_stats = {'hits': 0, 'misses': 0, 'stored': 0}
+
+def response_cache_enabled():
+    return getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 60 * 60) > 0
+
+def response_cache_key(view_name, generation, config_version, params):
+    """
+        params: already-normalized, hashable description of the request (see views._analytics_cache_params).
+    """
+    digest = hashlib.sha1(repr(params).encode()).hexdigest()
+    return f"response:{generation}:{config_version}:{view_name}:{digest}"
+
+def _count(stat):
+    with _response_stats_lock:
+        _response_stats[stat] += 1
+
+def get_cached_response(key):
+    response = caches[RESPONSE_CACHE].get(key)
+    _count('misses' if response is None else 'hits')
+    return response
+
+def cache_response(key, response):
+    """
+        Keeps a finished 200 HTML response. It is stored before SessionMiddleware adds the session
+        cookie, so session state must reach the page only through the key (views._analytics_cache_params).
+    """
+    if response.status_code != 200 or response.streaming:
+        return
+    caches[RESPONSE_CACHE].set(key, response, settings.RESPONSE_CACHE_TIMEOUT)
+    _count('stored')
+
+def response_cache_stats():
+    """
+        Hit / miss counters of this process since it started.
+    """
+    with _response_stats_lock:
+        stats = dict(_response_stats)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+    return stats
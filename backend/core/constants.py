@@ -128,6 +128,51 @@ EXCEL_COL_MAP = {
 
 }
 
+# Columns calculated during ingestion (see ingestion._add_derived_columns)
+EXCEL_DERIVED_COL_MAP = {
+    "Key Plans Ratio": "key_plans_ratio",
+    "Other Layouts": "other_layouts",
+    "WPR Half Week": "wpr_half_week",
+    "Manpower Ratio": "manpower_ratio",
+    "DPR Ratio": "dpr_ratio",
+    "Manpower Day Ratio": "manpower_day_ratio",
+}
+
+# Header aliases for text/metadata columns (lowercase). The FIRST alias present in a sheet wins.
+EXCEL_META_MAP = {
+    'project_name': ['project name', 'name'],
+    'sbu':          ['sbu', 'region'],
+    'stage':        ['stage', 'status'],
+    'floors':       ['floors', 'no of floors'],
+    'project_type': ['project type', 'type'],
+    'lead_id':      ['lead id', 'lead', 'id'],
+
+    'sales_head':   ['sales head', 's head'],
+    'sales_lead':   ['sales lead', 's lead'],
+
+    'design_dh':    ['dh', 'design head'],
+    'design_dm':    ['dm', 'design lead', 'design manager'],
+    'design_id':    ['id', 'design id'],
+    'design_3d':    ['3d', '3d visualizer'],
+
+    'ops_head':     ['cluster/bu head', 'ops head'],
+    'ops_pm':       ['spm/pm', 'project manager', 'pm'],
+    'ops_om':       ['som/om', 'ops manager', 'om'],
+    'ops_ss':       ['ss', 'site supervisor'],
+    'ops_mep':      ['mep'],
+    'ops_csc':      ['csc']
+}
+
+# Date columns (lowercase Excel header)
+EXCEL_DATE_MAP = {
+    'login_date': 'project login date',
+    'start_date': 'project start date',
+    'end_date':   'project end date',
+}
+
+# Headers that may carry the project identifier, in priority order
+EXCEL_ID_COLUMNS = ['project code', 'code', 'lead id']
+
 # ==============================================================================
 # REPORT COLUMN ORDERING 
 # ==============================================================================
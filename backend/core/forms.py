@@ -1,5 +1,13 @@
 from django import forms        # type:ignore
+from django.core.validators import FileExtensionValidator  # type:ignore
+
+from .importer import IMPORT_MODES
+from .ingestion import UPLOAD_EXTENSIONS
 
 class UploadFileForm(forms.Form):
     # The name 'file' here must match the name="file" in your HTML input
-    file = forms.FileField()
\ No newline at end of file
+    # Excel workbook, a single CSV/Parquet sheet, or a zip of them
+    file = forms.FileField(validators=[FileExtensionValidator([ext.lstrip('.') for ext in UPLOAD_EXTENSIONS])])
+    mode = forms.ChoiceField(choices=IMPORT_MODES, initial='upsert', required=False)
+    # Delete projects that are no longer present in the uploaded file (upsert mode)
+    retire_missing = forms.BooleanField(initial=True, required=False)
@@ -0,0 +1,617 @@
+# core/ingestion.py
+import contextlib
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+from pandas._libs.parsers import STR_NA_VALUES
+
+from .constants import (
+    EXCEL_COL_MAP, EXCEL_DERIVED_COL_MAP, EXCEL_META_MAP, EXCEL_DATE_MAP, EXCEL_ID_COLUMNS
+)
+
+# Order matters: later sheets override earlier ones (non-empty / non-zero values win).
+SHEET_TYPES = ('sales', 'design', 'operation')
+
+# Lowercase Excel header -> Project metric field
+METRIC_COL_MAP = {
+    str(xl_col).strip().lower(): db_field
+    for xl_col, db_field in {**EXCEL_COL_MAP, **EXCEL_DERIVED_COL_MAP}.items()
+}
+
+# Accepted upload types. CSV/Parquet carry one sheet each (named after it, e.g. sales.csv);
+# a zip bundles several of them.
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm', '.xls')
+TABLE_EXTENSIONS = ('.csv', '.parquet')
+UPLOAD_EXTENSIONS = EXCEL_EXTENSIONS + TABLE_EXTENSIONS + ('.zip',)
+DIRECTORY = 'dir'      # pseudo-extension: a folder of CSV/Parquet sheets (management command)
+
+# Raw columns the calculated ratios are built from (see _add_derived_columns)
+DERIVED_INPUT_COLUMNS = {
+    'no key plans spaces', 'mapped spaces', 'layouts', 'furniture layouts',
+    'wpr download weeks', 'weeks till date', 'actual manpower', 'planned manpower',
+    'dpr added days', 'days till date', 'manpower added days',
+}
+
+# Every lowercase header the engine can use. Anything else is skipped at read time.
+WANTED_COLUMNS = (
+    set(EXCEL_ID_COLUMNS) | set(METRIC_COL_MAP) | DERIVED_INPUT_COLUMNS
+    | set(EXCEL_DATE_MAP.values()) | {alias for aliases in EXCEL_META_MAP.values() for alias in aliases}
+)
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# SECTION 1: SHEET DISCOVERY & DERIVED COLUMNS
+# ==============================================================================
+
+def detect_sheets(sheet_names):
+    """
+        Maps each sheet type to the workbook sheet holding it (case insensitive).
+        Returns {'sales': name, 'design': name, 'operation': name} ('' when missing).
+    """
+    sheet_map = {'sales': '', 'design': '', 'operation': ''}
+    for name in sheet_names:
+        lower = str(name).lower()
+        if 'sales' in lower: sheet_map['sales'] = str(name)
+        elif 'design' in lower: sheet_map['design'] = str(name)
+        elif 'operation' in lower or 'ops' in lower: sheet_map['operation'] = str(name)
+    return sheet_map
+
+def _add_derived_columns(df, sheet_type):
+    """
+        Calculated ratio columns, computed on the raw (uncleaned) sheet values.
+    """
+    if sheet_type == 'design':
+        if 'no key plans spaces' in df.columns and 'mapped spaces' in df.columns:
+            df['key plans ratio'] = pd.to_numeric(df['no key plans spaces'], errors='coerce').fillna(0) / pd.to_numeric(df['mapped spaces'], errors='coerce').replace(0,1).fillna(0)
+        if 'layouts' in df.columns and 'furniture layouts' in df.columns:
+            df['other layouts'] = df['layouts'] - df['furniture layouts']
+
+    if sheet_type == 'operation':
+        ops_calcs = [
+            ('wpr half week','wpr download weeks','weeks till date'),
+            ('manpower ratio','actual manpower','planned manpower'),
+            ('dpr ratio','dpr added days','days till date'),
+            ('manpower day ratio','manpower added days','days till date')
+        ]
+        for t, n, d in ops_calcs:
+            if n in df.columns and d in df.columns:
+                df[t] = (pd.to_numeric(df[n], errors='coerce') / pd.to_numeric(df[d], errors='coerce').replace(0,1)).fillna(0)
+    return df
+
+# ==============================================================================
+# SECTION 2: WHOLE-COLUMN CLEANERS
+# ==============================================================================
+
+def _clean_id_column(df):
+    """
+        Normalized project code per row (first usable ID column wins), None when missing.
+    """
+    codes = pd.Series(None, index=df.index, dtype=object)
+    for col in EXCEL_ID_COLUMNS:
+        if col not in df.columns: continue
+        raw = df[col]
+        text = raw.astype(str).str.strip().str.upper()
+        usable = raw.notna() & ~raw.isin([0, '']) & (text != '') & (text != 'NAN')
+        codes = codes.where(codes.notna() | ~usable, text.str.replace('.0', '', regex=False))
+    return codes
+
+def _clean_str_column(series):
+    """
+        Stripped text; empty / NaN cells become None (i.e. "no value").
+    """
+    text = series.astype(str).str.strip()
+    keep = series.notna() & (text != '') & (text.str.lower() != 'nan')
+    return text.where(keep, None)
+
+def _clean_num_column(series):
+    """
+        Floats with '%' and ',' stripped; anything unparseable becomes 0.0.
+    """
+    if pd.api.types.is_bool_dtype(series):
+        return pd.Series(0.0, index=series.index)
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float).fillna(0.0)
+    text = series.astype(str).str.replace('%', '', regex=False).str.replace(',', '', regex=False).str.strip()
+    return pd.to_numeric(text, errors='coerce').where(series.notna(), 0.0).fillna(0.0)
+
+def _clean_date_column(series):
+    """
+        datetime.date per cell, None when empty. Unparseable values raise (fails the upload).
+    """
+    parsed = pd.to_datetime(series, format='mixed')
+    return parsed.dt.date.where(parsed.notna(), None)
+
+# ==============================================================================
+# SECTION 3: SHEET PREPARATION & MERGE
+# ==============================================================================
+
+def prepare_sheet(df, sheet_type):
+    """
+        Resolves header aliases once and cleans every mapped column in bulk.
+        Returns (frame, metric_fields): one row per source row with 'project_code' plus
+        cleaned fields. None/NaN means "no value" so the merge can apply precedence rules.
+    """
+    # 1. FORCE LOWERCASE HEADERS (duplicate headers: the right-most column wins)
+    df = df.copy()
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    df = df.loc[:, ~df.columns.duplicated(keep='last')]
+
+    # 2. CALCULATED COLUMNS
+    df = _add_derived_columns(df, sheet_type)
+
+    codes = _clean_id_column(df)
+    df = df[codes.notna()]
+    frame = pd.DataFrame({'project_code': codes[codes.notna()]}, index=df.index)
+
+    # 3. METADATA (first alias present in the sheet wins, even if blank)
+    for db_field, options in EXCEL_META_MAP.items():
+        for opt in options:
+            if opt in df.columns:
+                frame[db_field] = _clean_str_column(df[opt])
+                break
+
+    # 4. DATES
+    for db_field, xl_col in EXCEL_DATE_MAP.items():
+        if xl_col in df.columns:
+            frame[db_field] = _clean_date_column(df[xl_col])
+
+    # 5. METRICS (zero is treated as "no value" so a later non-zero wins)
+    metric_fields = []
+    for xl_col, db_field in METRIC_COL_MAP.items():
+        if xl_col in df.columns:
+            values = _clean_num_column(df[xl_col])
+            frame[db_field] = values.where(values != 0)
+            metric_fields.append(db_field)
+
+    return frame.reset_index(drop=True), metric_fields
+
+def merge_sheet_frames(prepared):
+    """
+        Keyed merge of prepared sheets on project_code, in sheet precedence order.
+        Non-empty text/dates and non-zero metrics from later rows win; a metric column
+        seen for a project but never non-zero is kept as 0.0.
+        Returns a list of dicts ready for Project(**record).
+    """
+    prepared = [(frame, fields) for frame, fields in prepared if not frame.empty]
+    if not prepared: return []
+
+    combined = pd.concat([frame for frame, _ in prepared], ignore_index=True, sort=False)
+    merged = combined.groupby('project_code', sort=False).last()
+
+    # Metric present (but zero everywhere) -> 0.0
+    for field in merged.columns:
+        sources = [frame['project_code'] for frame, fields in prepared if field in fields]
+        if not sources: continue
+        seen = merged.index.isin(pd.concat(sources).unique())
+        merged[field] = merged[field].where(merged[field].notna() | ~seen, 0.0)
+
+    merged = merged.astype(object).where(merged.notna(), None)
+
+    records = []
+    for code, row in zip(merged.index, merged.to_dict('records')):
+        record = {'project_code': code}
+        record.update({k: v for k, v in row.items() if v is not None})
+        records.append(record)
+    return records
+
+# ==============================================================================
+# SECTION 4: SINGLE-PASS WORKBOOK READER
+# ==============================================================================
+
+class _CountingReader:
+    """
+        Thin file wrapper that counts the bytes pulled from the upload, so the import
+        report can show what each sheet actually cost.
+    """
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = self.raw.read(size)
+        self.bytes_read += len(data)
+        return data
+
+    # Buffered readers (io.TextIOWrapper, used by the CSV parser) pull through these
+    read1 = read
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def seek(self, *args):
+        return self.raw.seek(*args)
+
+    def tell(self):
+        return self.raw.tell()
+
+    def seekable(self):
+        return True
+
+    def readable(self):
+        return True
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+def _wanted_column(header):
+    return str(header).strip().lower() in WANTED_COLUMNS
+
+def _load_prepared(read, label, sheet_type):
+    """
+        Runs read() -> raw frame, then prepare_sheet(), timing the two stages separately.
+        Returns (prepared, stats); stats carry the sheet's content fingerprint.
+    """
+    t0 = time.perf_counter()
+    df = read()
+    t1 = time.perf_counter()
+    prepared = prepare_sheet(df, sheet_type)
+    t2 = time.perf_counter()
+    return prepared, {
+        'sheet': label, 'type': sheet_type,
+        'rows': len(df), 'columns': len(df.columns), 'bytes': 0,
+        'hash': frame_fingerprint(*prepared),
+        'parse_seconds': round(t1 - t0, 3),
+        'clean_seconds': round(t2 - t1, 3),
+        'seconds': round(t2 - t0, 3),
+    }
+
+def _sheet_digest(frame, metric_fields):
+    """ sha256 seeded with a prepared sheet's column names and metric columns. """
+    digest = hashlib.sha256()
+    digest.update('\x1f'.join(map(str, frame.columns)).encode('utf-8'))
+    digest.update('\x1e'.join(metric_fields).encode('utf-8'))
+    return digest
+
+def _digest_rows(digest, frame, metric_fields):
+    """
+        Adds the row hashes of a prepared frame. Columns are hashed as float64 (metrics) or as plain
+        Python values (text, dates), so a row hashes the same whichever chunk it was read in.
+    """
+    metric_fields = set(metric_fields)
+    columns = {}
+    for name in frame.columns:
+        column = frame[name]
+        if name in metric_fields:
+            columns[name] = column.astype('float64')
+            continue
+        if pd.api.types.is_datetime64_any_dtype(column): column = column.dt.date
+        columns[name] = column.astype(object).where(column.notna(), None)
+    digest.update(pd.util.hash_pandas_object(pd.DataFrame(columns, index=frame.index), index=False).values.tobytes())
+
+def _combine_sheet_hashes(sheets):
+    """ Upload fingerprint from [(sheet_type, sheet hash)] in precedence order. """
+    combined = hashlib.sha256()
+    for sheet_type, sheet_hash in sheets:
+        combined.update(f"{sheet_type}:{sheet_hash};".encode('utf-8'))
+    return combined.hexdigest()
+
+def frame_fingerprint(frame, metric_fields):
+    """
+        sha256 of a prepared sheet: column names, metric columns and every cleaned value.
+        Independent of file-level noise (workbook metadata, styles, column order on disk).
+    """
+    digest = _sheet_digest(frame, metric_fields)
+    _digest_rows(digest, frame, metric_fields)
+    return digest.hexdigest()
+
+class StreamFingerprint:
+    """
+        content_hash of an upload read chunk by chunk (iter_workbook_chunks), built like the
+        batch report's: per-sheet digests of the cleaned rows, combined in precedence order.
+        Column names are taken from each sheet's first chunk.
+    """
+    def __init__(self):
+        self.sheets = []        # [{'type', 'rows', 'digest'}] in the order the sheets were read
+
+    def update(self, sheet_type, frame, metric_fields):
+        if not self.sheets or self.sheets[-1]['type'] != sheet_type:
+            self.sheets.append({'type': sheet_type, 'rows': 0, 'digest': _sheet_digest(frame, metric_fields)})
+        sheet = self.sheets[-1]
+        _digest_rows(sheet['digest'], frame, metric_fields)
+        sheet['rows'] += len(frame)
+
+    def track(self, chunks):
+        """ Passes the chunks through, fingerprinting each one on the way. """
+        for chunk in chunks:
+            self.update(*chunk)
+            yield chunk
+
+    def report(self):
+        """ {'sheets': [{'type', 'rows' (cleaned), 'hash'}], 'content_hash'} for what was read so far. """
+        sheets = [{'type': s['type'], 'rows': s['rows'], 'hash': s['digest'].hexdigest()} for s in self.sheets]
+        return {'sheets': sheets, 'content_hash': _combine_sheet_hashes([(s['type'], s['hash']) for s in sheets])}
+
+def _finish_report(report, prepared, started):
+    # Combined fingerprint in precedence order (see frame_fingerprint)
+    report['content_hash'] = _combine_sheet_hashes([(sheet['type'], sheet['hash']) for sheet in report['sheets']])
+
+    t0 = time.perf_counter()
+    records = merge_sheet_frames(prepared)
+    report['merge_seconds'] = round(time.perf_counter() - t0, 3)
+    report['seconds'] = round(time.perf_counter() - started, 3)
+    return records, report
+
+def _log_report(report):
+    for sheet in report['sheets']:
+        logger.info(
+            "Import sheet %(sheet)s (%(type)s): %(rows)d rows, %(columns)d cols, %(bytes)d bytes, "
+            "%(parse_seconds).3fs parse, %(clean_seconds).3fs clean", sheet
+        )
+
+def _build_from_workbook(raw):
+    """
+        Excel path: the archive is opened ONCE and each detected sheet is read from that
+        handle with only the mapped columns.
+    """
+    reader = _CountingReader(raw)
+    report = {'format': 'excel', 'workers': 1, 'sheets': [], 'bytes_read': 0, 'seconds': 0.0}
+    started = time.perf_counter()
+
+    xls = pd.ExcelFile(reader)
+    report['open_bytes'] = reader.bytes_read
+    sheet_map = detect_sheets(xls.sheet_names)
+
+    prepared = []
+    for sheet_type in SHEET_TYPES:
+        sheet_name = sheet_map[sheet_type]
+        if not sheet_name: continue
+
+        b0 = reader.bytes_read
+        frame, stats = _load_prepared(
+            lambda: pd.read_excel(xls, sheet_name=sheet_name, usecols=_wanted_column), sheet_name, sheet_type
+        )
+        stats['bytes'] = reader.bytes_read - b0
+        prepared.append(frame)
+        report['sheets'].append(stats)
+
+    report['bytes_read'] = reader.bytes_read
+    return _finish_report(report, prepared, started)
+
+def build_project_records(file, name=None, workers=1):
+    """
+        Full pipeline for an upload (file object, path, or a directory of sheet files). The
+        format is taken from the extension of `name` (or the file's own name): Excel
+        workbooks, single CSV/Parquet sheets, or a zip of them all go through the same
+        prepare/merge logic. With workers > 1 (paths only, capped at the CPU count) sheets
+        load in parallel processes.
+        Returns (records, report) where report holds rows/bytes/timings per sheet.
+    """
+    is_path = isinstance(file, (str, bytes)) or hasattr(file, '__fspath__')
+    workers = min(workers, os.cpu_count() or 1) if is_path else 1
+    if is_path and os.path.isdir(file):
+        name, ext = name or os.fsdecode(file), DIRECTORY
+    else:
+        name = name or (os.fsdecode(file) if is_path else getattr(file, 'name', '')) or ''
+        ext = upload_extension(name)
+        if ext not in UPLOAD_EXTENSIONS:
+            raise ValueError(f"Unsupported file type '{ext or name}'. Upload one of: {', '.join(UPLOAD_EXTENSIONS)}.")
+
+    if ext in EXCEL_EXTENSIONS and workers <= 1:
+        raw = open(file, 'rb') if is_path else file
+        try:
+            raw.seek(0)
+            records, report = _build_from_workbook(raw)
+        finally:
+            if is_path:
+                raw.close()
+    else:
+        source = os.fsdecode(file) if is_path else file
+        records, report = _build_from_sheets(source, name, ext, workers)
+
+    _log_report(report)
+    return records, report
+
+# ==============================================================================
+# SECTION 5: STREAMING READER (Memory-Bounded)
+# ==============================================================================
+
+_EXCEL_ERROR_CODES = {'#NULL!', '#DIV/0!', '#VALUE!', '#REF!', '#NAME?', '#NUM!', '#N/A'}
+
+def _normalize_cell(value):
+    """
+        Mirrors pandas' openpyxl cell conversion + default NA parsing, so streamed chunks
+        clean exactly like pd.read_excel frames (e.g. 5.0 -> 5, 'N/A' -> None).
+    """
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and (value in STR_NA_VALUES or value in _EXCEL_ERROR_CODES):
+        return None
+    return value
+
+def iter_workbook_chunks(file, chunk_size=5000):
+    """
+        Streams a workbook with openpyxl's read-only row iterator and yields
+        (sheet_type, prepared_frame, metric_fields) for every block of `chunk_size` rows.
+        Only one chunk per sheet is ever materialised, so memory stays flat regardless of
+        workbook size. Sheets are yielded in SHEET_TYPES precedence order.
+    """
+    from openpyxl import load_workbook              # type: ignore
+
+    wb = load_workbook(file, read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet_map = detect_sheets(wb.sheetnames)
+        for sheet_type in SHEET_TYPES:
+            sheet_name = sheet_map[sheet_type]
+            if not sheet_name: continue
+
+            ws = wb[sheet_name]
+            ws.reset_dimensions()
+            rows = ws.iter_rows(values_only=True)
+            header = next(rows, None)
+            if not header: continue
+
+            # Keep mapped headers only; exact duplicates keep the first column (as pandas does)
+            keep, names = [], []
+            for idx, col in enumerate(header):
+                if col is None or col in names or not _wanted_column(col): continue
+                keep.append(idx)
+                names.append(col)
+
+            buffer = []
+            for row in rows:
+                buffer.append([_normalize_cell(row[i]) if i < len(row) else None for i in keep])
+                if len(buffer) >= chunk_size:
+                    yield (sheet_type, *prepare_sheet(pd.DataFrame(buffer, columns=names), sheet_type))
+                    buffer = []
+            if buffer:
+                yield (sheet_type, *prepare_sheet(pd.DataFrame(buffer, columns=names), sheet_type))
+    finally:
+        wb.close()
+
+# ==============================================================================
+# SECTION 6: PER-SHEET READERS (CSV / Parquet / Concurrent)
+# ==============================================================================
+
+def upload_extension(name):
+    return os.path.splitext(str(name))[1].lower()
+
+def _read_csv(src):
+    """
+        Mapped columns only. ID columns stay text so codes like '0012' survive.
+    """
+    header = pd.read_csv(src, nrows=0).columns
+    src.seek(0)
+    id_cols = {c: str for c in header if str(c).strip().lower() in EXCEL_ID_COLUMNS}
+    return pd.read_csv(src, usecols=_wanted_column, dtype=id_cols)
+
+def _read_parquet(src):
+    try:
+        import pyarrow.parquet as pq            # type: ignore
+    except ImportError:
+        raise ValueError("Parquet uploads need the 'pyarrow' package installed on the server.")
+    pf = pq.ParquetFile(src)
+    return pf.read(columns=[c for c in pf.schema_arrow.names if _wanted_column(c)]).to_pandas()
+
+def _table_members(source, name, ext):
+    """
+        Every CSV/Parquet table in the upload: the path inside the zip / directory, or the
+        upload's own name for a single table.
+    """
+    if ext == DIRECTORY:
+        return [
+            f for f in sorted(os.listdir(source))
+            if upload_extension(f) in TABLE_EXTENSIONS and os.path.isfile(os.path.join(source, f))
+        ]
+    if ext == '.zip':
+        with zipfile.ZipFile(source) as zf:
+            return [
+                info.filename for info in zf.infolist()
+                if not info.is_dir() and '__MACOSX' not in info.filename
+                and not os.path.basename(info.filename).startswith('.')
+                and upload_extension(info.filename) in TABLE_EXTENSIONS
+            ]
+    return [os.path.basename(name)]
+
+def _open_table(source, ext, member):
+    """
+        Seekable binary handle (as a context manager) for one table of the upload.
+    """
+    if ext == DIRECTORY:
+        return open(os.path.join(source, member), 'rb')
+    if ext == '.zip':
+        with zipfile.ZipFile(source) as zf:
+            return io.BytesIO(zf.read(member))
+    if isinstance(source, str):
+        return open(source, 'rb')
+    source.seek(0)
+    return contextlib.nullcontext(source)
+
+def _plan_sheets(source, name, ext):
+    """
+        [(sheet_type, member)] in SHEET_TYPES precedence order.
+    """
+    if ext in EXCEL_EXTENSIONS:
+        with pd.ExcelFile(source) as xls:
+            sheet_map = detect_sheets(xls.sheet_names)
+        return [(t, sheet_map[t]) for t in SHEET_TYPES if sheet_map[t]]
+
+    members = _table_members(source, name, ext)
+    by_stem = {os.path.splitext(os.path.basename(m))[0]: m for m in members}
+    sheet_map = detect_sheets(by_stem)
+    if not any(sheet_map.values()):
+        raise ValueError(
+            f"Could not tell which sheet '{os.path.basename(name)}' holds. "
+            "Name the files after the sheets, e.g. sales.csv, design.csv, operations.csv."
+        )
+    return [(t, by_stem[sheet_map[t]]) for t in SHEET_TYPES if sheet_map[t]]
+
+def _load_sheet_task(source, ext, sheet_type, member):
+    """
+        Reads and prepares ONE sheet / table. The source is opened independently, so tasks
+        can run side by side. Returns (prepared, stats); stats['bytes'] counts what this task
+        read (a workbook sheet re-reads the archive index and shared strings, too).
+    """
+    with _open_table(source, ext, member) as src:
+        reader = _CountingReader(src)
+        if ext in EXCEL_EXTENSIONS:
+            read = lambda: pd.read_excel(reader, sheet_name=member, usecols=_wanted_column)
+        elif upload_extension(member) == '.parquet':
+            read = lambda: _read_parquet(reader)
+        else:
+            read = lambda: _read_csv(reader)
+        prepared, stats = _load_prepared(read, os.path.basename(member), sheet_type)
+    stats['bytes'] = reader.bytes_read
+    return prepared, stats
+
+# Long-lived pool for per-sheet loading. Workers are spawned (not forked) so they never
+# inherit DB connections or locks held by web / job threads; pandas is imported once per worker.
+_sheet_pool = None
+_sheet_pool_size = 0
+_sheet_pool_lock = threading.Lock()
+
+def _get_sheet_pool(workers):
+    global _sheet_pool, _sheet_pool_size
+    with _sheet_pool_lock:
+        if _sheet_pool is None or _sheet_pool_size < workers:
+            if _sheet_pool is not None:
+                _sheet_pool.shutdown(wait=False)
+            _sheet_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _sheet_pool_size = workers
+    return _sheet_pool
+
+def _reset_sheet_pool():
+    global _sheet_pool
+    with _sheet_pool_lock:
+        _sheet_pool = None
+
+def _build_from_sheets(source, name, ext, workers=1):
+    """
+        Per-sheet path (CSV/Parquet tables, zips, directories, or Excel with workers > 1).
+        With workers > 1 every sheet is parsed and cleaned in its own process (each one
+        reopens the source), so wall time approaches that of the largest sheet. Results
+        are merged in SHEET_TYPES precedence order whatever order they finish in.
+    """
+    report = {'format': 'excel' if ext in EXCEL_EXTENSIONS else ext.lstrip('.'), 'workers': 1, 'sheets': [], 'bytes_read': 0, 'seconds': 0.0}
+    started = time.perf_counter()
+
+    tasks = _plan_sheets(source, name, ext)
+    workers = min(workers, len(tasks))
+    if workers > 1:
+        report['workers'] = workers
+        pool = _get_sheet_pool(report['workers'])
+        try:
+            futures = [pool.submit(_load_sheet_task, source, ext, *task) for task in tasks]
+            results = [f.result() for f in futures]
+        except BrokenProcessPool:
+            _reset_sheet_pool()
+            raise
+    else:
+        results = [_load_sheet_task(source, ext, *task) for task in tasks]
+
+    report['sheets'] = [stats for _, stats in results]
+    report['bytes_read'] = sum(stats['bytes'] for stats in report['sheets'])
+    return _finish_report(report, [prepared for prepared, _ in results], started)
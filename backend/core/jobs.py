@@ -0,0 +1,214 @@
+# core/jobs.py
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings                    # type: ignore
+from django.core.cache import cache                 # type: ignore
+from django.db import connections, transaction      # type: ignore
+from django.utils import timezone                   # type: ignore
+
+from .models import ImportJob
+from .ingestion import build_project_records, iter_workbook_chunks, StreamFingerprint
+from .importer import stage_records, plan_import, publish_import, stream_import
+from .versioning import DATASET, get_version
+from .caches import warm_dataset_caches
+from .store import warm_project_store
+from .scores import warm_project_scores
+
+# Local worker pool. Imports are serialized by default (one worker) so two uploads
+# never diff against the same snapshot.
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'IMPORT_JOB_WORKERS', 1),
+                thread_name_prefix='import-job'
+            )
+    return _executor
+
+def _update_job(job, **fields):
+    for key, value in fields.items():
+        setattr(job, key, value)
+    job.save(update_fields=list(fields))
+
+def _finish_job(job, summary, rows):
+    warm_dataset_caches(summary['generation'])
+    warm_project_store(summary['generation'])
+    warm_project_scores(summary['generation'])
+    _update_job(
+        job, status='succeeded', stage='done', rows_total=max(job.rows_total, rows), rows_processed=rows,
+        created_count=summary['created'], updated_count=summary['updated'],
+        unchanged_count=summary['unchanged'], removed_count=summary['removed'],
+        generation=summary['generation'], finished_at=timezone.now()
+    )
+
+def _progress_key(job_id):
+    return f"import_job:{job_id}:progress"
+
+def _stream_progress(job, rows):
+    """
+        Rows flushed so far by a streaming import. They are written inside the import's own
+        transaction, so the job row cannot show them yet; pollers read them from the cache.
+    """
+    cache.set(_progress_key(job.pk), {'rows_total': rows, 'rows_processed': rows}, 60 * 60)
+
+def _skip_job(job, previous):
+    """ Closes a job whose data is already live: no writes, generation and caches untouched. """
+    _update_job(
+        job, status='succeeded', stage='done', no_changes=True,
+        rows_total=previous.rows_total, rows_processed=previous.rows_processed,
+        unchanged_count=previous.rows_processed, generation=previous.generation, finished_at=timezone.now()
+    )
+
+# ==============================================================================
+# SECTION 1: ENQUEUE
+# ==============================================================================
+
+def enqueue_import(uploaded_file, mode='upsert', retire_missing=False):
+    """
+        Persists the upload to a temp file, records an ImportJob and hands it to the
+        worker pool once the surrounding transaction commits. Returns the job immediately.
+    """
+    suffix = os.path.splitext(uploaded_file.name)[1] or '.xlsx'
+    fd, path = tempfile.mkstemp(prefix='import_', suffix=suffix, dir=getattr(settings, 'IMPORT_UPLOAD_DIR', None))
+    digest = hashlib.sha256()
+    with os.fdopen(fd, 'wb') as out:
+        for chunk in uploaded_file.chunks():
+            out.write(chunk)
+            digest.update(chunk)
+
+    # Big workbooks go through the row-streaming reader to keep memory flat
+    threshold_mb = getattr(settings, 'IMPORT_STREAM_THRESHOLD_MB', 25)
+    streaming = suffix.lower() in ('.xlsx', '.xlsm') and uploaded_file.size > threshold_mb * 1024 * 1024
+
+    job = ImportJob.objects.create(
+        file_name=uploaded_file.name, source_path=path,
+        mode=mode, retire_missing=retire_missing, streaming=streaming, file_hash=digest.hexdigest()
+    )
+    transaction.on_commit(lambda: _get_executor().submit(run_import_job, job.pk))
+    return job
+
+# ==============================================================================
+# SECTION 2: WORKER
+# ==============================================================================
+
+def run_import_job(job_id):
+    """
+        Worker entry point: parse -> validate -> publish, recording progress on the job.
+        Runs on a pool thread, so it owns (and must close) its DB connection.
+    """
+    try:
+        job = ImportJob.objects.get(pk=job_id)
+        _update_job(job, status='running', stage='parsing', started_at=timezone.now())
+        try:
+            previous = find_identical_import(job, file_hash=job.file_hash)
+            if previous:
+                _skip_job(job, previous)
+                return
+
+            if job.streaming:
+                _update_job(job, stage='streaming')
+                fingerprint = StreamFingerprint()
+                chunks = iter_workbook_chunks(job.source_path, chunk_size=getattr(settings, 'IMPORT_CHUNK_SIZE', 5000))
+                summary = stream_import(
+                    fingerprint.track(chunks), mode=job.mode, retire_missing=job.retire_missing,
+                    progress=lambda rows: _stream_progress(job, rows)
+                )
+                report = fingerprint.report()
+                _update_job(job, stats={'format': 'excel', 'streaming': True, **report}, content_hash=report['content_hash'])
+                rows = summary['created'] + summary['updated'] + summary['unchanged']
+                _finish_job(job, summary, rows)
+                return
+
+            records, report = build_project_records(
+                job.source_path, name=job.file_name, workers=getattr(settings, 'IMPORT_PARSE_WORKERS', 1)
+            )
+            _update_job(job, stage='validating', rows_total=len(records), stats=report, content_hash=report['content_hash'])
+
+            # Re-saved copy of the same data (different bytes, same cleaned sheets)
+            previous = find_identical_import(job, content_hash=job.content_hash)
+            if previous:
+                _skip_job(job, previous)
+                return
+
+            staged = stage_records(records)
+            plan = plan_import(staged, mode=job.mode, retire_missing=job.retire_missing)
+            _update_job(job, stage='publishing', rows_processed=plan['unchanged'])
+
+            summary = publish_import(plan)
+            _finish_job(job, summary, len(staged))
+        except Exception as e:
+            _update_job(job, status='failed', error=str(e), finished_at=timezone.now())
+        finally:
+            cache.delete(_progress_key(job.pk))
+            if job.source_path and os.path.exists(job.source_path):
+                os.remove(job.source_path)
+    finally:
+        connections.close_all()
+
+def job_progress(job):
+    """
+        JSON-friendly snapshot of a job for the polling endpoint.
+    """
+    progress = cache.get(_progress_key(job.pk)) if job.status == 'running' else None
+    return {
+        'id': job.pk,
+        'status': job.status,
+        'stage': job.stage,
+        'file_name': job.file_name,
+        'streaming': job.streaming,
+        'rows_total': progress['rows_total'] if progress else job.rows_total,
+        'rows_processed': progress['rows_processed'] if progress else job.rows_processed,
+        'created': job.created_count,
+        'updated': job.updated_count,
+        'unchanged': job.unchanged_count,
+        'removed': job.removed_count,
+        'generation': job.generation,
+        'no_changes': job.no_changes,
+        'error': job.error,
+        'stats': job.stats,
+        'finished': job.status in ('succeeded', 'failed'),
+    }
+
+# ==============================================================================
+# SECTION 3: DEDUPLICATION
+# ==============================================================================
+
+def file_sha256(path, block_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _is_full_sync(job):
+    return job.mode == 'replace' or job.retire_missing
+
+def find_identical_import(job, **fingerprint):
+    """
+        Latest successful import with the same fingerprint (file_hash=... or content_hash=...)
+        whose result is still what is live, i.e. nothing was published since. A full sync
+        (replace / retire_missing) only matches an earlier full sync, because it may have to
+        remove rows an additional upsert left behind. Returns None when the import must run.
+    """
+    field, value = next(iter(fingerprint.items()))
+    if not value:
+        return None
+
+    previous = (
+        ImportJob.objects.filter(status='succeeded', **{field: value})
+        .exclude(pk=job.pk).order_by('-finished_at').first()
+    )
+    if previous is None or previous.generation != get_version(DATASET):
+        return None
+
+    if _is_full_sync(job) and not _is_full_sync(previous):
+        return None
+    return previous
@@ -0,0 +1,79 @@
+# core/management/commands/benchmark_formats.py
+import os
+import tempfile
+import time
+import zipfile
+
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError   # type: ignore
+
+from core.ingestion import SHEET_TYPES, build_project_records, detect_sheets
+
+class Command(BaseCommand):
+    help = (
+        "Converts a project workbook to zipped CSV / Parquet sheets and times the "
+        "ingestion engine on every format side by side. Nothing is written to the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('workbook', help="Path to an .xlsx workbook with Sales/Design/Operations sheets")
+        parser.add_argument('--repeat', type=int, default=3, help="Runs per format; the best time is reported")
+
+    def handle(self, *args, **options):
+        path = options['workbook']
+        if not os.path.exists(path):
+            raise CommandError(f"File not found: {path}")
+
+        with tempfile.TemporaryDirectory(prefix='import_bench_') as tmp:
+            sources = [('xlsx', path)] + self._export(path, tmp)
+
+            baseline = None
+            rows = []
+            for label, src in sources:
+                best, records = None, None
+                for _ in range(max(1, options['repeat'])):
+                    t0 = time.perf_counter()
+                    records, _ = build_project_records(src)
+                    elapsed = time.perf_counter() - t0
+                    best = elapsed if best is None else min(best, elapsed)
+                if baseline is None:
+                    baseline = (best, records)
+                rows.append((label, os.path.getsize(src), best, baseline[0] / best, len(records), records == baseline[1]))
+
+        self.stdout.write(f"{'format':<14}{'size (KB)':>12}{'best (s)':>12}{'speedup':>10}{'projects':>10}  same as xlsx")
+        for label, size, best, speedup, count, same in rows:
+            self.stdout.write(f"{label:<14}{size / 1024:>12.1f}{best:>12.3f}{speedup:>9.1f}x{count:>10}  {'yes' if same else 'NO'}")
+
+    def _export(self, path, tmp):
+        """
+            Writes each detected sheet as <type>.csv / <type>.parquet and zips each set.
+            Returns [(label, path)] for the benchmark.
+        """
+        xls = pd.ExcelFile(path)
+        sheet_map = detect_sheets(xls.sheet_names)
+        frames = {t: pd.read_excel(xls, sheet_name=sheet_map[t]) for t in SHEET_TYPES if sheet_map[t]}
+
+        formats = [('csv', lambda df, out: df.to_csv(out, index=False))]
+        try:
+            import pyarrow     # type: ignore  # noqa: F401
+            # Mixed-type object columns (text + numbers) are stored as text, as a BI export would
+            formats.append(('parquet', lambda df, out: df.astype({
+                c: str for c in df.columns if df[c].dtype == object
+            }).where(df.notna(), None).to_parquet(out, index=False)))
+        except ImportError:
+            self.stderr.write("pyarrow is not installed; skipping Parquet.")
+
+        sources = []
+        for ext, write in formats:
+            files = []
+            for sheet_type, df in frames.items():
+                out = os.path.join(tmp, f"{sheet_type}.{ext}")
+                write(df, out)
+                files.append(out)
+
+            bundle = os.path.join(tmp, f"{ext}_bundle.zip")
+            with zipfile.ZipFile(bundle, 'w', zipfile.ZIP_DEFLATED) as zf:
+                for f in files:
+                    zf.write(f, os.path.basename(f))
+            sources.append((f"{ext} (zip)", bundle))
+        return sources
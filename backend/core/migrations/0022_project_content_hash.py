@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-17 04:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_alter_project_design_3d_alter_project_design_dh_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', editable=False, help_text='Fingerprint of the imported row (used for upserts)', max_length=40),
+        ),
+    ]
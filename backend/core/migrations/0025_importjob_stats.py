@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-17 04:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_importjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='stats',
+            field=models.JSONField(blank=True, default=dict, help_text='Per-sheet read report (bytes, rows, seconds)'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-17 04:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_importjob_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='streaming',
+            field=models.BooleanField(default=False, help_text='Row-streaming reader (large workbooks)'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0.1 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0026_importjob_streaming'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, help_text='sha256 of the cleaned sheet contents', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='file_hash',
+            field=models.CharField(blank=True, db_index=True, help_text='sha256 of the uploaded bytes', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='no_changes',
+            field=models.BooleanField(default=False, help_text='Identical to the data already published; nothing was written'),
+        ),
+    ]
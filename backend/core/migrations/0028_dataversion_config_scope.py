@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-17 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0027_importjob_fingerprints'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dataversion',
+            name='scope',
+            field=models.CharField(choices=[('dataset', 'Dataset Generation'), ('config', 'Metric Configuration')], max_length=20, unique=True),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 6.0.1 on 2026-10-17 11:40
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copies of core.people as of this migration: later edits to the app code must not
+# change what an already-written migration does when it is replayed.
+PEOPLE_FIELDS = (
+    'sales_head', 'sales_lead',
+    'design_dh', 'design_dm', 'design_id', 'design_3d',
+    'ops_head', 'ops_pm', 'ops_om', 'ops_ss', 'ops_mep', 'ops_csc',
+    'm_head', 'm_lead', 'p_head', 'p_mgr', 'p_exec', 'f_head',
+)
+_SEPARATORS = re.compile(r'[,/;]')
+_MAX_NAME = 255
+
+
+def split_people(value):
+    if not value: return []
+    names = (' '.join(part.split())[:_MAX_NAME] for part in _SEPARATORS.split(str(value)))
+    return [n for n in names if n]
+
+
+def person_key(name):
+    return ' '.join(str(name).split()).casefold()[:_MAX_NAME]
+
+
+def backfill_assignments(apps, schema_editor):
+    """ Tokenizes the stakeholder columns of the projects already imported. """
+    Project = apps.get_model('core', 'Project')
+    Person = apps.get_model('core', 'Person')
+    ProjectAssignment = apps.get_model('core', 'ProjectAssignment')
+
+    person_ids, assignments = {}, []
+    for pk, *values in Project.objects.values_list('pk', *PEOPLE_FIELDS).iterator(chunk_size=2000):
+        for field, value in zip(PEOPLE_FIELDS, values):
+            for key, name in {person_key(n): n for n in split_people(value)}.items():
+                if key not in person_ids: person_ids[key] = Person.objects.create(name=name, key=key).pk
+                assignments.append(ProjectAssignment(project_id=pk, role=field, person_id=person_ids[key]))
+        if len(assignments) >= 5000:
+            ProjectAssignment.objects.bulk_create(assignments)
+            assignments = []
+    ProjectAssignment.objects.bulk_create(assignments)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0028_dataversion_config_scope'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Person',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Spelling as first imported', max_length=255)),
+                ('key', models.CharField(help_text='Case- and whitespace-insensitive match key', max_length=255, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProjectAssignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(help_text='Project stakeholder field', max_length=30)),
+                ('person', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignments', to='core.person')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='assignments', to='core.project')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['role', 'person'], name='assignment_role_person_idx')],
+                'unique_together': {('project', 'role', 'person')},
+            },
+        ),
+        migrations.RunPython(backfill_assignments, migrations.RunPython.noop),
+    ]
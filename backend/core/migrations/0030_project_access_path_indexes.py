@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0029_people_assignments'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['stage', 'sbu', 'login_date'], name='project_stage_sbu_login_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['sbu', 'login_date'], name='project_sbu_login_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['sbu', 'start_date', 'end_date'], name='project_sbu_start_end_idx'),
+        ),
+    ]
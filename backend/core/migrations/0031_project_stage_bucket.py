@@ -0,0 +1,36 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:45
+
+from django.db import migrations, models
+
+# Frozen copy of core.models.stage_bucket_for as of this migration: later edits to the
+# model must not change what an already-written migration does when it is replayed.
+POST_STAGE_MARKERS = ('post', 'exec', 'ops', 'handover')
+
+
+def stage_bucket_for(stage):
+    raw_stage = str(stage).strip().lower()
+    return 'Post' if any(x in raw_stage for x in POST_STAGE_MARKERS) else 'Pre'
+
+
+def fill_stage_bucket(apps, schema_editor):
+    """ One UPDATE per distinct stage name. """
+    Project = apps.get_model('core', 'Project')
+    for stage in Project.objects.values_list('stage', flat=True).distinct():
+        projects = Project.objects.filter(stage__isnull=True) if stage is None else Project.objects.filter(stage=stage)
+        projects.update(stage_bucket=stage_bucket_for(stage))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0030_project_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='stage_bucket',
+            field=models.CharField(choices=[('Pre', 'Pre'), ('Post', 'Post')], db_index=True, default='Pre', editable=False, help_text='Scoring bucket derived from stage (see stage_bucket_for)', max_length=4),
+        ),
+        migrations.RunPython(fill_stage_bucket, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0.1 on 2026-10-17 13:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0031_project_stage_bucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage_bucket', models.CharField(max_length=4)),
+                ('score', models.FloatField()),
+                ('config_hash', models.CharField(max_length=40)),
+                ('project', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.project')),
+                ('user_group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.usergroup')),
+            ],
+            options={
+                'unique_together': {('config_hash', 'user_group', 'project')},
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0.1 on 2026-10-17 16:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0033_dataversion_scores_scope'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DatasetChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('generation', models.PositiveBigIntegerField(db_index=True)),
+                ('project_id', models.BigIntegerField(help_text='Plain id: the project may have been deleted')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ScoreSet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('config_hash', models.CharField(max_length=40)),
+                ('generation', models.PositiveBigIntegerField()),
+                ('user_group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.usergroup')),
+            ],
+            options={
+                'unique_together': {('config_hash', 'user_group')},
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-17 16:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0034_scoreset_datasetchange'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='projectassignment',
+            name='project',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignments', to='core.project'),
+        ),
+    ]
@@ -1,5 +1,13 @@
 from django.db import models            # type: ignore
 
+# Stage names that count as 'Post' for scoring (substring match, case-insensitive); anything else is 'Pre'
+POST_STAGE_MARKERS = ('post', 'exec', 'ops', 'handover')
+
+def stage_bucket_for(stage):
+    """ 'Post' or 'Pre' scoring bucket of a raw stage name (None counts as 'Pre'). """
+    raw_stage = str(stage).strip().lower()
+    return 'Post' if any(x in raw_stage for x in POST_STAGE_MARKERS) else 'Pre'
+
 # ==============================================================================
 # 1. CORE DATA MODEL (The Project)
 # ==============================================================================
@@ -14,9 +22,12 @@ class Project(models.Model):
     project_name = models.CharField(max_length=255, null=True, blank=True)
     sbu = models.CharField(max_length=50, null=True, blank=True, verbose_name="Region/SBU")
     stage = models.CharField(max_length=50, null=True, blank=True, verbose_name="Project Stage")
+    stage_bucket = models.CharField(max_length=4, choices=[('Pre', 'Pre'), ('Post', 'Post')], default='Pre', db_index=True,
+                                    editable=False, help_text="Scoring bucket derived from stage (see stage_bucket_for)")
     floors = models.CharField(max_length=50, null=True, blank=True)
     project_type = models.CharField(max_length=100, null=True, blank=True)
     lead_id = models.CharField(max_length=100, null=True, blank=True)
+    content_hash = models.CharField(max_length=40, blank=True, default='', editable=False, help_text="Fingerprint of the imported row (used for upserts)")
     
     # --- Key Dates ---
     login_date = models.DateField(null=True, blank=True)
@@ -102,10 +113,53 @@ class Project(models.Model):
     wpr_ratio = models.FloatField(default=0.0)
     manpower_day_ratio = models.FloatField(default=0.0)
 
+    class Meta:
+        # Access paths of the analytics filters (views._fetch_projects_filtered / _get_stage_querysets);
+        # equality columns first, then the SBU list, then the date range. Checked by check_query_plans.
+        indexes = [
+            models.Index(fields=['stage', 'sbu', 'login_date'], name='project_stage_sbu_login_idx'),
+            models.Index(fields=['sbu', 'login_date'], name='project_sbu_login_idx'),
+            models.Index(fields=['sbu', 'start_date', 'end_date'], name='project_sbu_start_end_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.stage_bucket = stage_bucket_for(self.stage)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.project_code} - {self.project_name}"
 
 
+class Person(models.Model):
+    """
+        One stakeholder as named in the project sheets (a name or an email).
+        Stakeholder columns often list several people; each becomes its own Person.
+    """
+    name = models.CharField(max_length=255, help_text="Spelling as first imported")
+    key = models.CharField(max_length=255, unique=True, help_text="Case- and whitespace-insensitive match key")
+
+    def __str__(self):
+        return self.name
+
+class ProjectAssignment(models.Model):
+    """
+        Person X holds stakeholder column Y (e.g. 'ops_pm') on a project.
+        Maintained by the importer (core/people.py) and used by the people filters instead of
+        substring scans over the stakeholder columns.
+    """
+    # Bulk deletes by the importer skip the collector (see people.delete_projects)
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='assignments')
+    person = models.ForeignKey(Person, on_delete=models.CASCADE, related_name='assignments')
+    role = models.CharField(max_length=30, help_text="Project stakeholder field")
+
+    class Meta:
+        unique_together = ('project', 'role', 'person')
+        indexes = [models.Index(fields=['role', 'person'], name='assignment_role_person_idx')]
+
+    def __str__(self):
+        return f"{self.person} : {self.role} on {self.project_id}"
+
+
 # ==============================================================================
 # 2. CONFIGURATION MODELS (Admin Managed)
 # ==============================================================================
@@ -190,4 +244,124 @@ class MetricWeight(models.Model):
         verbose_name = "Group Weight"
 
     def __str__(self):
-        return f"{self.user_group} : {self.metric} ({self.factor})"
\ No newline at end of file
+        return f"{self.user_group} : {self.metric} ({self.factor})"
+
+class ProjectScore(models.Model):
+    """
+        Materialized leaderboard score of one project for one user group (core/scores.py).
+        config_hash identifies what the score was computed from: the group's weighted metrics and
+        their DB default thresholds. The rows of a hash are read only while its ScoreSet is at the
+        request's dataset generation.
+    """
+    # No FK constraint: a refresh replaces the rows of changed and deleted projects itself, and
+    # reads join through Project anyway
+    project = models.ForeignKey(Project, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    user_group = models.ForeignKey(UserGroup, on_delete=models.CASCADE)
+    stage_bucket = models.CharField(max_length=4)
+    score = models.FloatField()
+    config_hash = models.CharField(max_length=40)
+
+    class Meta:
+        unique_together = ('config_hash', 'user_group', 'project')
+
+    def __str__(self):
+        return f"{self.project_id} / {self.user_group_id}: {self.score}"
+
+class ScoreSet(models.Model):
+    """
+        Marks the ProjectScore rows of one (config_hash, user_group) as complete for one dataset
+        generation. A later generation made of logged edits only (DatasetChange) moves the set
+        forward by rewriting just the changed projects' rows.
+    """
+    config_hash = models.CharField(max_length=40)
+    user_group = models.ForeignKey(UserGroup, on_delete=models.CASCADE)
+    generation = models.PositiveBigIntegerField()
+
+    class Meta:
+        unique_together = ('config_hash', 'user_group')
+
+    def __str__(self):
+        return f"{self.config_hash[:8]} / {self.user_group_id} @ {self.generation}"
+
+# ==============================================================================
+# 3. DATA IMPORTS
+# ==============================================================================
+
+class ImportJob(models.Model):
+    """
+        One background import of an uploaded file (see core/jobs.py).
+        Polled by the upload page for progress.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued', db_index=True)
+    stage = models.CharField(max_length=30, blank=True, help_text="Current pipeline step (parsing, validating, publishing...)")
+    file_name = models.CharField(max_length=255)
+    source_path = models.CharField(max_length=500, blank=True, help_text="Temporary copy of the upload")
+    mode = models.CharField(max_length=20, default='upsert')
+    retire_missing = models.BooleanField(default=False)
+    streaming = models.BooleanField(default=False, help_text="Row-streaming reader (large workbooks)")
+
+    # --- Fingerprints (re-uploads of identical data are skipped) ---
+    file_hash = models.CharField(max_length=64, blank=True, db_index=True, help_text="sha256 of the uploaded bytes")
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True, help_text="sha256 of the cleaned sheet contents")
+    no_changes = models.BooleanField(default=False, help_text="Identical to the data already published; nothing was written")
+
+    # --- Progress & Results ---
+    rows_total = models.PositiveIntegerField(default=0)
+    rows_processed = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    updated_count = models.PositiveIntegerField(default=0)
+    unchanged_count = models.PositiveIntegerField(default=0)
+    removed_count = models.PositiveIntegerField(default=0)
+    generation = models.PositiveBigIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    stats = models.JSONField(default=dict, blank=True, help_text="Per-sheet read report (bytes, rows, seconds)")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Import #{self.pk} ({self.file_name}) - {self.status}"
+
+
+# ==============================================================================
+# 4. SYSTEM STATE (Cache Invalidation)
+# ==============================================================================
+
+class DataVersion(models.Model):
+    """
+        Monotonic version counters shared by every worker process.
+        'dataset' is bumped each time an import publishes new project data (or a project is edited),
+        'config' each time an admin edits metrics, weights, groups or success categories,
+        'scores' each time the materialized leaderboard scores are rewritten.
+    """
+    SCOPE_CHOICES = [('dataset', 'Dataset Generation'), ('config', 'Metric Configuration'), ('scores', 'Materialized Scores')]
+
+    scope = models.CharField(max_length=20, choices=SCOPE_CHOICES, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.scope} v{self.version}"
+
+class DatasetChange(models.Model):
+    """
+        One project touched by a dataset generation that came from a single edit (admin save or
+        delete) instead of an import. A process holding an older generation catches up by re-reading
+        only the logged projects (core/versioning.py changed_projects).
+    """
+    generation = models.PositiveBigIntegerField(db_index=True)
+    project_id = models.BigIntegerField(help_text="Plain id: the project may have been deleted")
+
+    def __str__(self):
+        return f"v{self.generation}: project {self.project_id}"
@@ -0,0 +1,116 @@
+# core/people.py
+import re
+
+from django.db.models import Q                      # type: ignore
+
+from .models import Project, Person, ProjectAssignment
+
+# Every stakeholder column that gets tokenized into ProjectAssignment rows
+PEOPLE_FIELDS = (
+    'sales_head', 'sales_lead',
+    'design_dh', 'design_dm', 'design_id', 'design_3d',
+    'ops_head', 'ops_pm', 'ops_om', 'ops_ss', 'ops_mep', 'ops_csc',
+    'm_head', 'm_lead', 'p_head', 'p_mgr', 'p_exec', 'f_head',
+)
+# Separators between several people in one stakeholder cell
+_SEPARATORS = re.compile(r'[,/;]')
+_MAX_NAME = Person._meta.get_field('name').max_length
+
+# ==============================================================================
+# SECTION 1: TOKENIZING
+# ==============================================================================
+
+def split_people(value):
+    """
+        The people named in one stakeholder cell: 'a@x.com, B Name / c' -> ['a@x.com', 'B Name', 'c'].
+        Whitespace inside a name is collapsed; empty parts are dropped.
+    """
+    if not value: return []
+    names = (' '.join(part.split())[:_MAX_NAME] for part in _SEPARATORS.split(str(value)))
+    return [n for n in names if n]
+
+def person_key(name):
+    """ Match key of a name: two spellings that differ only in case/spacing are one Person. """
+    return ' '.join(str(name).split()).casefold()[:_MAX_NAME]
+
+def selected_keys(selected):
+    """ Person keys of the values picked in a people filter (a legacy multi-name value counts as each name). """
+    return sorted({person_key(n) for value in selected for n in split_people(value)})
+
+# ==============================================================================
+# SECTION 2: MAINTENANCE (called by the importer inside the publish transaction)
+# ==============================================================================
+
+def _persons_for(names):
+    """ {key: Person pk} for the given names, creating missing Persons. """
+    wanted = {}
+    for name in names: wanted.setdefault(person_key(name), name)
+    keys = list(wanted)
+    ids = {}
+    for i in range(0, len(keys), 500):
+        ids.update(Person.objects.filter(key__in=keys[i:i + 500]).values_list('key', 'pk'))
+    missing = [Person(name=wanted[k], key=k) for k in keys if k not in ids]
+    if missing:
+        Person.objects.bulk_create(missing, batch_size=500, ignore_conflicts=True)
+        new_keys = [p.key for p in missing]
+        for i in range(0, len(new_keys), 500):
+            ids.update(Person.objects.filter(key__in=new_keys[i:i + 500]).values_list('key', 'pk'))
+    return ids
+
+def sync_assignments(project_codes, batch_size=500):
+    """
+        Rebuilds the ProjectAssignment rows of the given (just written) projects from their
+        stakeholder columns.
+    """
+    project_codes = list(project_codes)
+    for i in range(0, len(project_codes), batch_size):
+        rows = list(Project.objects.filter(project_code__in=project_codes[i:i + batch_size]).values_list('pk', *PEOPLE_FIELDS))
+        ProjectAssignment.objects.filter(project_id__in=[row[0] for row in rows]).delete()
+
+        pairs = {}      # (project pk, role) -> names, de-duplicated by key
+        for pk, *values in rows:
+            for field, value in zip(PEOPLE_FIELDS, values):
+                names = {person_key(n): n for n in split_people(value)}
+                if names: pairs[(pk, field)] = names
+        person_ids = _persons_for(n for names in pairs.values() for n in names.values())
+
+        ProjectAssignment.objects.bulk_create([
+            ProjectAssignment(project_id=pk, role=field, person_id=person_ids[key])
+            for (pk, field), names in pairs.items() for key in names
+        ], batch_size=batch_size)
+
+def delete_projects(queryset):
+    """
+        Bulk delete for the importer and the admin's bulk action: the projects' assignments, then
+        the projects, as two plain DELETEs without the collector's per-row fetches and without
+        delete signals (the caller starts one dataset generation for all of them). Everywhere else,
+        Project.delete() / queryset.delete() cascade to the assignments and signal each row.
+        Returns the number of projects deleted.
+    """
+    ProjectAssignment.objects.filter(project__in=queryset.values('pk'))._raw_delete(queryset.db)
+    return queryset._raw_delete(queryset.db)
+
+# ==============================================================================
+# SECTION 3: FILTERING
+# ==============================================================================
+
+def assigned_to_q(role, selected):
+    """
+        Q for projects where any of the selected people holds the given stakeholder column:
+        an indexed lookup on (role, person) instead of a LIKE over every row.
+    """
+    keys = selected_keys(selected)
+    if not keys: return Q(pk__in=[])
+    return Q(pk__in=ProjectAssignment.objects.filter(role=role, person__key__in=keys).values('project_id'))
+
+def people_by_role(exclude_code=None):
+    """
+        {stakeholder field: sorted person names} of everyone assigned to at least one project
+        (optionally leaving one project out).
+    """
+    assignments = ProjectAssignment.objects.all()
+    if exclude_code: assignments = assignments.exclude(project__project_code=exclude_code)
+    people = {field: set() for field in PEOPLE_FIELDS}
+    for role, name in assignments.values_list('role', 'person__name').distinct().iterator(chunk_size=5000):
+        if role in people: people[role].add(name)
+    return {field: sorted(names) for field, names in people.items()}
@@ -0,0 +1,138 @@
+# core/scores.py
+import hashlib
+import json
+import logging
+
+import numpy as np
+from django.db import transaction                   # type: ignore
+
+from .models import Project, ProjectScore, ScoreSet
+from .caches import get_config
+from .store import get_project_store, build_project_store
+from .versioning import DATASET, SCORES, bump_version, get_version, changed_projects
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# SECTION 1: SCORING CONTEXT
+# ==============================================================================
+
+def scoring_context(user_group, threshold_map):
+    """
+        Prepares Metrics & Weights for Scoring.
+    """
+    stage_totals = {}
+    valid_metrics = []
+
+    for m in get_config().weighted_metrics(user_group):
+        # We calculate the "Total Possible" based on the Max Threshold (Cap)
+        # Assuming Max Threshold IS the max credits possible for that metric
+        db_min = m.min_threshold
+        db_max = m.max_threshold
+
+        max_points = db_max
+
+        stage_totals[m.stage] = stage_totals.get(m.stage, 0) + max_points
+
+        # DASHBOARD OVERRIDE LOGIC:
+        # If user changed threshold in Dashboard, it overrides the MINIMUM threshold.
+        # Default falls back to DB min_threshold.
+        effective_min = threshold_map.get(m.field_name, db_min)
+
+        valid_metrics.append({
+            'field': m.field_name,
+            'label': m.label,
+            'stage': m.stage,
+            'min': effective_min,
+            'max': db_max,
+            'weight_factor': max_points
+        })
+    return valid_metrics, stage_totals
+
+def score_hash(user_group, valid_metrics, stage_totals):
+    """
+        Fingerprint of everything a project's score depends on besides its own data. A request whose
+        session thresholds differ from the DB defaults gets a hash no rebuild ever wrote, so it scores live.
+    """
+    payload = [
+        user_group.pk,
+        [(vm['field'], vm['stage'], vm['min'], vm['max']) for vm in valid_metrics],
+        sorted(stage_totals.items()),
+    ]
+    return hashlib.sha1(json.dumps(payload, default=str).encode()).hexdigest()
+
+def has_scores(config_hash, user_group, generation):
+    """ True while this group's scores for config_hash are complete for the dataset generation (one index lookup). """
+    return ScoreSet.objects.filter(config_hash=config_hash, user_group_id=user_group.pk, generation=generation).exists()
+
+# ==============================================================================
+# SECTION 2: REBUILD
+# ==============================================================================
+# Leaderboards read the table when the request's hash has a ScoreSet at the request's generation and
+# score live otherwise, so a rebuild that has not run yet (or failed) only costs speed, never correctness.
+
+def refresh_project_scores(generation=None, batch_size=2000):
+    """
+        Brings the scores of every group with weighted metrics, at the DB default thresholds, to the
+        given (default: current) dataset generation: a set that is only behind by logged edits
+        rewrites just those projects' rows, any other set is rewritten whole. Then drops the rows
+        of hashes no longer in use. Sets already current are skipped, so repeated calls are cheap.
+        Bumps the 'scores' version when anything was written. Returns the number of rows written.
+    """
+    if generation is None:
+        generation = get_version(DATASET)
+    config = get_config()
+    defaults = dict(config.min_thresholds)
+    set_generations = {(h, group_id): g for h, group_id, g in ScoreSet.objects.values_list('config_hash', 'user_group_id', 'generation')}
+    sources = {}        # set generation -> (store to score, project ids to replace; None: all)
+    live_hashes, written = set(), 0
+
+    for group in config.groups:
+        valid_metrics, stage_totals = scoring_context(group, defaults)
+        if not valid_metrics: continue
+        h = score_hash(group, valid_metrics, stage_totals)
+        live_hashes.add(h)
+        since = set_generations.get((h, group.pk), -1)
+        # Current, or already moved on by the refresh of a newer generation
+        if since >= generation: continue
+
+        if since not in sources:
+            changed = changed_projects(since, generation) if since >= 0 else None
+            if changed is None:
+                store = get_project_store(generation) or build_project_store(generation)
+                # Already superseded by a newer publish, whose own refresh writes the scores that count
+                if store.generation != generation: return written
+            else:
+                store = build_project_store(generation, Project.objects.filter(pk__in=changed))
+            sources[since] = (store, changed)
+        store, changed = sources[since]
+
+        scores, is_post = store.scores(np.arange(store.size), valid_metrics, stage_totals)
+        rows = [
+            ProjectScore(project_id=pk, user_group_id=group.pk, config_hash=h,
+                         score=round(score, 1), stage_bucket='Post' if post else 'Pre')
+            for pk, score, post in zip(store.ids.tolist(), scores.tolist(), is_post.tolist())
+        ]
+        stale = ProjectScore.objects.filter(config_hash=h, user_group_id=group.pk)
+        if changed is not None: stale = stale.filter(project_id__in=changed)
+        # A set moves to the new generation together with its rows: has_scores() never sees a half-written set
+        with transaction.atomic():
+            stale.delete()
+            ProjectScore.objects.bulk_create(rows, batch_size=batch_size, ignore_conflicts=True)
+            ScoreSet.objects.update_or_create(config_hash=h, user_group_id=group.pk, defaults={'generation': generation})
+        written += len(rows)
+
+    ProjectScore.objects.exclude(config_hash__in=live_hashes).delete()
+    ScoreSet.objects.exclude(config_hash__in=live_hashes).delete()
+    if written: bump_version(SCORES)
+    return written
+
+def warm_project_scores(generation=None):
+    """
+        refresh_project_scores() after a publish or a scoring-config edit. Failures are logged,
+        never raised: leaderboards score live until the next refresh.
+    """
+    try:
+        refresh_project_scores(generation)
+    except Exception:
+        logger.exception("Could not refresh project scores for generation %s", generation)
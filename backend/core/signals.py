@@ -1,7 +1,108 @@
 # core/signals.py
+import threading
+
+from django.conf import settings                                    # type: ignore
 from django.dispatch import receiver                                # type: ignore
-from django.db.models.signals import post_save, m2m_changed         # type: ignore
-from .models import Metric
+from django.db import connections, transaction                      # type: ignore
+from django.db.models.signals import post_save, post_delete, m2m_changed    # type: ignore
+from .models import Project, Department, UserGroup, SuccessMetric, Metric, MetricWeight
+from .versioning import DATASET, CONFIG, bump_version, get_version, record_dataset_change
+from .caches import invalidate_config, warm_dataset_caches
+from .store import warm_project_store
+from .people import sync_assignments
+from .scores import warm_project_scores
 
 # OLD LOGIC REMOVED.
-# The new system uses the MetricWeight table and calculates percentages live on the dashboard. No signals are required here.
\ No newline at end of file
+# The new system uses the MetricWeight table and calculates percentages live on the dashboard.
+
+# ==============================================================================
+# SECTION 1: DEBOUNCED BACKGROUND RECOMPUTE
+# ==============================================================================
+# Edits only bump version counters (cheap, inside the edit's transaction). Everything derived from
+# the data is reloaded once edits have been quiet for SCORING_RECOMPUTE_DELAY_SECONDS, in one
+# background thread: one admin save firing 30 signals leads to a single recompute.
+
+_recompute_lock = threading.Lock()
+_recompute_timer = None
+_pending_scopes = set()
+
+def schedule_recompute(scope):
+    """
+        Queues a recompute for a changed scope (DATASET or CONFIG); restarts the quiet period.
+        With a delay of 0 it runs right away in the calling thread.
+    """
+    global _recompute_timer
+    delay = getattr(settings, 'SCORING_RECOMPUTE_DELAY_SECONDS', 2)
+    with _recompute_lock:
+        _pending_scopes.add(scope)
+        if _recompute_timer is not None: _recompute_timer.cancel()
+        _recompute_timer = None
+        if delay > 0:
+            _recompute_timer = threading.Timer(delay, _run_recompute)
+            _recompute_timer.daemon = True
+            _recompute_timer.start()
+    if delay <= 0:
+        _run_recompute(close_connections=False)
+
+def _run_recompute(close_connections=True):
+    global _recompute_timer
+    with _recompute_lock:
+        scopes = set(_pending_scopes)
+        _pending_scopes.clear()
+        _recompute_timer = None
+    if not scopes: return
+    try:
+        if DATASET in scopes:
+            generation = get_version(DATASET)
+            warm_dataset_caches(generation)
+            warm_project_store(generation)
+        invalidate_config()
+        warm_project_scores()
+    finally:
+        if close_connections: connections.close_all()
+
+# ==============================================================================
+# SECTION 2: CONFIG VERSION STAMPS
+# ==============================================================================
+# Any admin edit to the scoring configuration bumps the 'config' version inside the edit's own
+# transaction, so every process's ConfigSnapshot (core/caches.py) is rebuilt once it commits.
+
+CONFIG_MODELS = (Department, UserGroup, SuccessMetric, Metric, MetricWeight)
+
+def _config_changed(sender, **kwargs):
+    bump_version(CONFIG)
+    transaction.on_commit(invalidate_config)
+    transaction.on_commit(lambda: schedule_recompute(CONFIG))
+
+for _model in CONFIG_MODELS:
+    post_save.connect(_config_changed, sender=_model, dispatch_uid=f'config_version_save_{_model.__name__}')
+    post_delete.connect(_config_changed, sender=_model, dispatch_uid=f'config_version_delete_{_model.__name__}')
+
+@receiver(m2m_changed, sender=Metric.visible_to_groups.through, dispatch_uid='config_version_visibility')
+def _visibility_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        _config_changed(sender, **kwargs)
+
+# ==============================================================================
+# SECTION 3: PROJECT EDITS OUTSIDE THE IMPORTER
+# ==============================================================================
+# Imports bump the dataset generation themselves (bulk writes send no signals). A project saved or
+# deleted one by one (admin, shell, management commands) starts a new generation too, logged with
+# its id: the project store and the materialized scores then re-read just that project instead of
+# the whole table. Bulk deletes through people.delete_projects send no signals; their callers
+# call dataset_changed() once for all the ids.
+
+def dataset_changed(project_ids=None):
+    """ New dataset generation for an edit of the given projects (None: unknown, reload everything). """
+    record_dataset_change(project_ids)
+    transaction.on_commit(lambda: schedule_recompute(DATASET))
+
+@receiver(post_save, sender=Project, dispatch_uid='dataset_version_project_save')
+def _project_saved(sender, instance, raw=False, **kwargs):
+    if raw: return
+    sync_assignments([instance.project_code])
+    dataset_changed([instance.pk])
+
+@receiver(post_delete, sender=Project, dispatch_uid='dataset_version_project_delete')
+def _project_deleted(sender, instance, **kwargs):
+    dataset_changed([instance.pk])
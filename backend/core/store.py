@@ -0,0 +1,253 @@
+# core/store.py
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from django.conf import settings                    # type: ignore
+from django.db import models                        # type: ignore
+
+from .models import Project
+from .people import split_people, person_key, selected_keys
+from .versioning import DATASET, get_version, changed_projects
+
+# Derived arrays (e.g. stage membership per filter set) kept per store, least recently used dropped first
+STORE_MEMO_ENTRIES = 64
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# SECTION 1: COLUMNAR PROJECT STORE
+# ==============================================================================
+# The analytics views only ever filter, count and score the Project table. The whole table is
+# held per process as NumPy columns (float64 per metric, integer codes per text column,
+# datetime64 per date), loaded once per dataset generation; filters become boolean masks.
+# The database stays the source of truth: a new generation loads a new store, or patches the old
+# one when it only differs by logged single-project edits (core/versioning.py changed_projects).
+
+class ProjectStore:
+    """
+        Read-only column arrays for every Project, in primary-key order.
+        Text columns are categorical: codes[field] indexes categories[field], whose last
+        entry is None (so code -1, a NULL, maps to None without a special case).
+    """
+    def __init__(self, generation, ids, metrics, codes, categories, dates):
+        self.generation = generation
+        self.size = len(ids)
+        self.ids = ids
+        self.metrics = metrics          # {field: float64 array}
+        self.codes = codes              # {field: int32 array}
+        self.categories = categories    # {field: object array of distinct values + None}
+        self.dates = dates              # {field: datetime64[D] array, NaT for NULL}
+        self._sorted = {}               # {field: (row order, values in that order)}, filled on demand
+        self._memo = OrderedDict()
+        self._memo_lock = threading.Lock()
+
+        # 'Post' / 'Pre' scoring bucket per row (the stage_bucket column)
+        self.is_post = _frozen(self.equals('stage_bucket', 'Post'))
+
+    def memo(self, key, build):
+        """
+            build() once per key for the lifetime of this store (a new generation starts empty).
+            Holds STORE_MEMO_ENTRIES results; treat them as read-only.
+        """
+        with self._memo_lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                return self._memo[key]
+        value = build()
+        with self._memo_lock:
+            self._memo[key] = value
+            while len(self._memo) > STORE_MEMO_ENTRIES:
+                self._memo.popitem(last=False)
+        return value
+
+    # --- Masks (same NULL semantics as the ORM lookups they replace) ---
+
+    def everything(self):
+        return np.ones(self.size, dtype=bool)
+
+    def nothing(self):
+        return np.zeros(self.size, dtype=bool)
+
+    def _category_mask(self, field, matches):
+        wanted = [i for i, v in enumerate(self.categories[field][:-1]) if matches(v)]
+        return np.isin(self.codes[field], wanted)
+
+    def isin(self, field, values):
+        """ field__in=values """
+        values = set(values)
+        return self._category_mask(field, lambda v: v in values)
+
+    def equals(self, field, value):
+        """ field=value """
+        return self._category_mask(field, lambda v: v == value)
+
+    def assigned_any(self, field, selected):
+        """ people.assigned_to_q(field, selected): any of the selected people is among the field's names """
+        keys = set(selected_keys(selected))
+        return self._category_mask(field, lambda v: any(person_key(n) in keys for n in split_people(v)))
+
+    def not_blank(self, field):
+        """ Neither NULL nor '' """
+        return self._category_mask(field, lambda v: v != '')
+
+    def between(self, field, start, end):
+        """ field__range=[start, end] (inclusive, NULL never matches) """
+        column = self.dates[field]
+        return (column >= np.datetime64(start, 'D')) & (column <= np.datetime64(end, 'D'))
+
+    def at_least(self, field, threshold):
+        """ field__gte=threshold, compared in float64 like the database (no rounding at the boundary) """
+        return self.metrics[field] >= np.float64(threshold)
+
+    # --- Reads ---
+
+    def values(self, field, index):
+        """ Python values (None for NULL) of one text column for the row positions in index. """
+        return self.categories[field][self.codes[field][index]].tolist()
+
+    def sorted_values(self, field, mask):
+        """
+            Values of one metric for the rows in mask, ascending (NaN left out). The column is sorted
+            once per store; each call is then a single O(n) selection.
+        """
+        if field not in self._sorted:
+            column = self.metrics[field]
+            order = np.argsort(column, kind='stable')
+            order = order[~np.isnan(column[order])]
+            self._sorted[field] = (_frozen(order), _frozen(column[order]))
+        order, values = self._sorted[field]
+        return values[mask[order]]
+
+    def count_at_least(self, mask, fields, thresholds):
+        """
+            Rows in mask, and rows in mask with field >= threshold for each pair.
+            Returns (total, [count per field]).
+        """
+        total = int(np.count_nonzero(mask))
+        return total, [int(np.count_nonzero(mask & self.at_least(f, t))) for f, t in zip(fields, thresholds)]
+
+    def scores(self, index, valid_metrics, stage_totals):
+        """
+            Vectorized _calculate_project_score for the rows in index (same arithmetic, metric by
+            metric, so per-project sums agree). Returns (unrounded scores, is_post flags).
+        """
+        is_post = self.is_post[index]
+        earned = np.zeros(len(index), dtype=np.float64)
+        for vm in valid_metrics:
+            if stage_totals.get(vm['stage'], 0) <= 0 or vm['max'] <= 0: continue
+            column = self.metrics.get(vm['field'])
+            if column is None: continue
+            factor = ((vm['max'] - vm['min']) + 1) / vm['max']
+            points = np.minimum(column[index] * factor, vm['max'])
+            earned += np.where(is_post == (vm['stage'] == 'Post'), points, 0.0)
+        return earned, is_post
+
+def _frozen(array):
+    array.flags.writeable = False
+    return array
+
+def build_project_store(generation, queryset=None):
+    """
+        Loads the Project table (or just the projects in queryset) into a ProjectStore
+        (one pass, streamed in chunks).
+    """
+    fields = [f for f in Project._meta.concrete_fields if f.name != 'content_hash']
+    names = [f.attname for f in fields]
+    if queryset is None: queryset = Project.objects.all()
+    rows = queryset.order_by('pk').values_list(*names).iterator(chunk_size=5000)
+    frame = pd.DataFrame.from_records(rows, columns=names)
+
+    metrics, codes, categories, dates = {}, {}, {}, {}
+    for f in fields:
+        column = frame[f.attname]
+        if isinstance(f, models.FloatField):
+            metrics[f.name] = _frozen(column.to_numpy(dtype=np.float64, na_value=np.nan))
+        elif isinstance(f, models.DateField):
+            dates[f.name] = _frozen(np.array(column.tolist(), dtype='datetime64[D]'))
+        elif isinstance(f, models.CharField):
+            field_codes, uniques = pd.factorize(column)
+            codes[f.name] = _frozen(field_codes.astype(np.int32))
+            categories[f.name] = _frozen(np.append(np.asarray(uniques, dtype=object), None))
+
+    ids = _frozen(frame['id'].to_numpy(dtype=np.int64))
+    return ProjectStore(generation, ids, metrics, codes, categories, dates)
+
+def patch_project_store(store, generation, project_ids):
+    """
+        store carried forward to a later generation that differs only in project_ids: those rows
+        are re-read (dropped if deleted, added if new) and merged in, all others are copied.
+    """
+    fresh = build_project_store(generation, Project.objects.filter(pk__in=project_ids))
+    keep = ~np.isin(store.ids, np.array(sorted(project_ids), dtype=np.int64))
+    ids = np.concatenate([store.ids[keep], fresh.ids])
+    order = np.argsort(ids, kind='stable')
+
+    def merge(old, new):
+        return _frozen(np.concatenate([old[keep], new])[order])
+
+    codes, categories = {}, {}
+    for field, known in store.categories.items():
+        # Re-code the fresh rows against the existing categories, appending values not seen before
+        index = {value: i for i, value in enumerate(known[:-1])}
+        for value in fresh.categories[field][:-1]: index.setdefault(value, len(index))
+        recode = np.array([index[v] for v in fresh.categories[field][:-1]] + [-1], dtype=np.int32)
+        codes[field] = merge(store.codes[field], recode[fresh.codes[field]])
+        categories[field] = _frozen(np.append(np.array(list(index), dtype=object), None))
+
+    return ProjectStore(
+        generation, _frozen(ids[order]),
+        {field: merge(column, fresh.metrics[field]) for field, column in store.metrics.items()},
+        codes, categories,
+        {field: merge(column, fresh.dates[field]) for field, column in store.dates.items()},
+    )
+
+# ==============================================================================
+# SECTION 2: PER-PROCESS INSTANCE
+# ==============================================================================
+
+_store_lock = threading.Lock()
+_store = None
+
+def store_enabled():
+    return getattr(settings, 'PROJECT_STORE_ENABLED', True)
+
+def get_project_store(generation=None):
+    """
+        The ProjectStore for the given (default: current) dataset generation, loading it on
+        first use (or patching the previous one when only logged edits happened in between).
+        None when PROJECT_STORE_ENABLED is off: callers fall back to the ORM.
+    """
+    global _store
+    if not store_enabled():
+        return None
+    if generation is None:
+        generation = get_version(DATASET)
+
+    # A request that read the generation just before a publish is happy with the newer store
+    store = _store
+    if store is not None and store.generation >= generation:
+        return store
+    with _store_lock:
+        if _store is None or _store.generation < generation:
+            changed = None if _store is None else changed_projects(_store.generation, generation)
+            if changed is not None:
+                _store = patch_project_store(_store, generation, changed)
+            else:
+                _store = None   # let the old arrays go before the new ones are allocated
+                _store = build_project_store(generation)
+        return _store
+
+def warm_project_store(generation):
+    """
+        Loads the new generation right after a publish (in the publishing process). Failures are
+        logged, never raised: the next request loads it anyway.
+    """
+    if not store_enabled():
+        return
+    try:
+        get_project_store(generation)
+    except Exception:
+        logger.exception("Could not load the project store for generation %s", generation)
@@ -1,3 +1,570 @@
-from django.test import TestCase        # type:ignore
+import io
+import os
+import random
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+from django.conf import settings                                    # type: ignore
+from django.contrib.sessions.backends.db import SessionStore        # type: ignore
+from django.core.cache import cache, caches                         # type: ignore
+from django.db import connection                                    # type: ignore
+from django.test import TestCase, RequestFactory, override_settings  # type: ignore
+
+from . import caches as config_caches, ingestion, jobs, store as project_store, versioning, views
+from .caches import get_config
+from .importer import import_projects, stream_import
+from .management.commands import check_query_plans
+from .ingestion import build_project_records, iter_workbook_chunks, merge_sheet_frames, StreamFingerprint
+from .models import Project, Department, UserGroup, SuccessMetric, Metric, MetricWeight, ProjectScore, ScoreSet, ProjectAssignment, ImportJob, DatasetChange
+from .people import split_people, person_key, assigned_to_q, delete_projects
+from .scores import scoring_context, refresh_project_scores
+from .versioning import DATASET, CONFIG, bump_version, get_version
+
+# Metric columns the seeded configuration scores (a few of each department)
+SEEDED_METRICS = {
+    'Sales': ['req_uploaded', 'client_access', 'boq_uploaded'],
+    'Design': ['renders', 'mapped_spaces', 'key_plans_ratio'],
+    'Operations': ['site_images', 'manpower_ratio', 'dpr_ratio'],
+}
+SBUS = ['North', 'South', 'West', 'Central']
+# Dashboard date window per view (the rolling Post window needs more than the login range)
+STAGE_WINDOWS = {
+    'Sales': (date(2024, 1, 1), date(2024, 12, 31)),
+    'Design': (date(2024, 3, 1), date(2024, 9, 30)),
+    'Operations': (date(2024, 3, 1), date(2024, 9, 30)),
+}
+# Values a threshold edit likes to land on (several are not exact in binary floating point)
+METRIC_VALUES = [0, 0.1, 0.2, 0.3, 1 / 3, 0.5, 0.7, 1, 1.1, 2.5, 3, 7, 10]
+
+# ==============================================================================
+# SECTION 1: FIXTURES
+# ==============================================================================
+
+def reset_process_state():
+    """
+        Per-process state keyed by version counters: the counters roll back with each test's
+        transaction and repeat, so cached snapshots of an earlier test would look current.
+    """
+    project_store._store = None
+    config_caches._config_snapshot = None
+    config_caches._config_checked_at = 0.0
+    versioning._generation = None
+    versioning._generation_checked_at = 0.0
+    cache.clear()
+    caches[config_caches.RESPONSE_CACHE].clear()
+
+def seed_config():
+    """ One lead group per department, every seeded metric in both stages, weighted for the group. """
+    success = SuccessMetric.objects.create(name='Adoption', color='success')
+    for i, (dept_name, fields) in enumerate(SEEDED_METRICS.items()):
+        department = Department.objects.create(name=dept_name)
+        group = UserGroup.objects.create(name=f'{dept_name} Lead', department=department)
+        for stage in ('Pre', 'Post'):
+            for j, field in enumerate(fields):
+                metric = Metric.objects.create(
+                    label=field.replace('_', ' ').title(), field_name=field, department=department, stage=stage,
+                    min_threshold=[0.3, 0.5, 1.0][j], max_threshold=10.0, success_metric=success,
+                )
+                MetricWeight.objects.create(metric=metric, user_group=group, factor=(i + j) % 10 + 1)
+
+def project_records(n=80, seed=7):
+    """ Ingestion-style records with metric values on (and around) typical threshold edges. """
+    rng = random.Random(seed)
+    fields = [f for fields in SEEDED_METRICS.values() for f in fields]
+    records = []
+    for i in range(n):
+        record = {
+            'project_code': f'TP-{i:03d}', 'project_name': f'Project {i}',
+            'sbu': rng.choice(SBUS), 'stage': rng.choice(['Pre Sales', 'Post Sales', 'Execution', 'Handover']),
+            'login_date': date(2024, rng.randint(1, 12), rng.randint(1, 28)),
+            'start_date': date(2024, rng.randint(1, 6), rng.randint(1, 28)),
+            'end_date': date(2024, rng.randint(7, 12), rng.randint(1, 28)),
+            'sales_lead': rng.choice(['Alice A', 'alice a', 'Bob B, Carol C', 'carol c / Dan D', None]),
+            'ops_pm': rng.choice(['Pm One', 'Pm Two; pm one', None]),
+        }
+        record.update({f: rng.choice(METRIC_VALUES) for f in fields})
+        records.append(record)
+    return records
+
+def analytics_request(path='/', data=None, session=None):
+    """ GET request with a real (DB) session, as SessionMiddleware would attach it. """
+    request = RequestFactory().get(path, data or {})
+    request.session = session if session is not None else SessionStore()
+    return request
+
+@override_settings(CONFIG_VERSION_CHECK_SECONDS=0, DATASET_VERSION_CHECK_SECONDS=0, SCORING_RECOMPUTE_DELAY_SECONDS=0,
+                   PROJECT_STORE_ENABLED=True)
+class AnalyticsTestCase(TestCase):
+    """ Seeded configuration + projects, with fresh per-process caches. """
+    def setUp(self):
+        reset_process_state()
+        self.addCleanup(reset_process_state)
+        seed_config()
+        import_projects(project_records())
+
+    def orm_only(self):
+        """ Context manager: the ORM fallback instead of the project store. """
+        return override_settings(PROJECT_STORE_ENABLED=False)
+
+    def stage_counts(self, view_mode, thresholds_for):
+        """ {(stage, field, threshold): count} through _get_stage_sources / _count_metric_hits. """
+        start_dt, end_dt = STAGE_WINDOWS[view_mode]
+        roll_start, roll_end = start_dt - timedelta(days=180), end_dt + timedelta(days=240)    # as _get_request_params
+        request = analytics_request()
+        sources = views._get_stage_sources(request, view_mode, SBUS[:3], start_dt, end_dt, roll_start, roll_end)
+        counts = {}
+        for stage, source in zip(('Pre', 'Post'), sources):
+            for field in SEEDED_METRICS[view_mode]:
+                thresholds = thresholds_for(field)
+                total, hits = views._count_metric_hits(request, source, [{'field': field}] * len(thresholds), thresholds)
+                counts[(stage, 'total')] = total
+                counts.update({(stage, field, t): c for t, c in zip(thresholds, hits)})
+        return counts
+
+# ==============================================================================
+# SECTION 2: INGESTION & IMPORT
+# ==============================================================================
+
+def fixture_sheets():
+    """ The fixture's three sheets as {name: DataFrame}. """
+    return pd.read_excel(fixture_workbook(), sheet_name=None)
+
+def fixture_workbook():
+    """
+        Three sheets where the same projects appear more than once, to pin the precedence
+        rules: sales -> design -> operation, non-empty text and non-zero metrics win.
+    """
+    sales = pd.DataFrame({
+        'Project Code': ['p-1', 'P-2', ' p-3 ', None],
+        'Project Name': ['Sales One', 'Sales Two', 'Sales Three', 'Orphan'],
+        'SBU': ['North', 'South', None, 'West'],
+        'Stage': ['Pre Sales', 'Pre Sales', 'Post Sales', 'Pre Sales'],
+        'Sales Lead': ['a@x.com', 'B Name, c@x.com', None, 'x'],
+        'Project Login Date': [pd.Timestamp(2024, 1, 5), None, '2024-03-04', None],
+        'Requirements': [3, '2%', '1,000', 1],
+        'BOQ': [0, 5, 0, 0],
+    })
+    design = pd.DataFrame({
+        'Code': ['P-1', 'P-2', 'P-4'],
+        'Name': ['Design One', None, 'Design Four'],
+        'DH': ['dh1', 'dh2 / dh3', None],
+        'Requirements': [0, 4, 0],
+        'Renders': [2, 0, 1.5],
+        'Project Start Date': [pd.Timestamp(2024, 2, 1), None, None],
+    })
+    operations = pd.DataFrame({
+        'Project Code': ['P-1', 'P-2'],
+        'Status': ['Execution', None],
+        'Project Name': ['', 'Ops Two'],
+        'Renders': [0, 3],
+    })
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer) as writer:
+        sales.to_excel(writer, sheet_name='Sales Data', index=False)
+        design.to_excel(writer, sheet_name='Design', index=False)
+        operations.to_excel(writer, sheet_name='Operations', index=False)
+    buffer.seek(0)
+    buffer.name = 'fixture.xlsx'
+    return buffer
+
+class IngestionTests(TestCase):
+    def test_workbook_records_follow_sheet_precedence(self):
+        records, report = build_project_records(fixture_workbook())
+        by_code = {r['project_code']: r for r in records}
+
+        self.assertEqual(sorted(by_code), ['P-1', 'P-2', 'P-3', 'P-4'])
+        self.assertEqual([s['type'] for s in report['sheets']], ['sales', 'design', 'operation'])
+        self.assertTrue(report['content_hash'])
+
+        p1, p2, p3, p4 = (by_code[c] for c in ('P-1', 'P-2', 'P-3', 'P-4'))
+        # Later non-empty text wins, blanks never overwrite
+        self.assertEqual(p1['project_name'], 'Design One')
+        self.assertEqual(p1['stage'], 'Execution')
+        self.assertEqual(p2['project_name'], 'Ops Two')
+        self.assertEqual(p2['stage'], 'Pre Sales')
+        # Later non-zero metrics win, zeros never overwrite; zero everywhere is kept as 0.0
+        self.assertEqual(p1['req_uploaded'], 3.0)
+        self.assertEqual(p2['req_uploaded'], 4.0)
+        self.assertEqual(p1['renders'], 2.0)
+        self.assertEqual(p2['renders'], 3.0)
+        self.assertEqual(p1['boq_uploaded'], 0.0)
+        self.assertEqual(p2['boq_uploaded'], 5.0)
+        # Cell cleaning: '%' / ',' stripped, mixed date cells parsed, codes upper-cased and stripped
+        self.assertEqual(p3['req_uploaded'], 1000.0)
+        self.assertEqual(p3['login_date'], date(2024, 3, 4))
+        self.assertEqual(p1['login_date'], date(2024, 1, 5))
+        self.assertEqual(p1['start_date'], date(2024, 2, 1))
+        self.assertEqual(p4['project_name'], 'Design Four')
+        self.assertNotIn('sbu', p3)
+
+    def test_per_sheet_reader_reports_bytes_read(self):
+        records, _ = build_project_records(fixture_workbook())
+        with tempfile.TemporaryDirectory() as folder:
+            for name, frame in fixture_sheets().items():
+                frame.to_csv(os.path.join(folder, f'{name}.csv'), index=False)
+            tables, report = build_project_records(folder)
+            sizes = [os.path.getsize(os.path.join(folder, f'{s["sheet"]}')) for s in report['sheets']]
+
+        self.assertEqual(tables, records)
+        self.assertEqual(len(report['sheets']), 3)
+        for sheet, size in zip(report['sheets'], sizes):
+            self.assertGreaterEqual(sheet['bytes'], size, sheet['sheet'])
+        self.assertEqual(report['bytes_read'], sum(s['bytes'] for s in report['sheets']))
+
+    def test_workbook_sheet_task_reports_bytes_read(self):
+        # What each parse worker runs for a workbook sheet (it re-opens the file itself)
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'fixture.xlsx')
+            with open(path, 'wb') as out:
+                out.write(fixture_workbook().getvalue())
+            _, stats = ingestion._load_sheet_task(path, '.xlsx', 'design', 'Design')
+        self.assertEqual(stats['rows'], 3)
+        self.assertGreater(stats['bytes'], 0)
+
+    def test_streamed_chunks_merge_like_the_batch_reader(self):
+        records, _ = build_project_records(fixture_workbook())
+        chunks = [(frame, fields) for _, frame, fields in iter_workbook_chunks(fixture_workbook(), chunk_size=2)]
+        self.assertEqual(merge_sheet_frames(chunks), records)
+
+@override_settings(CONFIG_VERSION_CHECK_SECONDS=0, DATASET_VERSION_CHECK_SECONDS=0, SCORING_RECOMPUTE_DELAY_SECONDS=0)
+class ImportJobTests(TestCase):
+    def setUp(self):
+        reset_process_state()
+        self.addCleanup(reset_process_state)
+
+    def run_job(self, streaming):
+        """ An uploaded copy of the fixture workbook through run_import_job, on this test's connection. """
+        fd, path = tempfile.mkstemp(suffix='.xlsx')
+        with os.fdopen(fd, 'wb') as out:
+            out.write(fixture_workbook().getvalue())
+        job = ImportJob.objects.create(file_name='fixture.xlsx', source_path=path, streaming=streaming, file_hash=f'bytes-{streaming}')
+        with mock.patch.object(jobs, 'connections'), self.captureOnCommitCallbacks(execute=True):
+            jobs.run_import_job(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'succeeded', job.error)
+        return job
+
+    def test_streamed_fingerprint_matches_the_batch_reader(self):
+        _, report = build_project_records(fixture_workbook())
+        fingerprint = StreamFingerprint()
+        list(fingerprint.track(iter_workbook_chunks(fixture_workbook(), chunk_size=2)))
+        self.assertEqual(fingerprint.report()['content_hash'], report['content_hash'])
+
+    def test_stream_import_reports_progress_per_chunk(self):
+        seen = []
+        stream_import(iter_workbook_chunks(fixture_workbook(), chunk_size=2), progress=seen.append)
+        self.assertEqual(seen, sorted(seen))
+        self.assertEqual(len(seen), 5)     # sheets of 4, 3 and 2 rows, in chunks of 2
+        self.assertEqual(seen[-1], sum(len(f) for _, f, _ in iter_workbook_chunks(fixture_workbook(), chunk_size=2)))
+
+    def test_streaming_job_records_fingerprint_and_rows(self):
+        streamed = self.run_job(streaming=True)
+        _, report = build_project_records(fixture_workbook())
+        self.assertEqual(streamed.content_hash, report['content_hash'])
+        self.assertEqual(streamed.rows_total, 4)
+        self.assertEqual(streamed.rows_processed, 4)
+        self.assertTrue(streamed.stats['streaming'])
+
+        # The same data uploaded again through the batch reader is recognised as already live
+        again = self.run_job(streaming=False)
+        self.assertTrue(again.no_changes)
+        self.assertEqual(again.generation, streamed.generation)
+
+    def test_job_progress_shows_streamed_rows(self):
+        job = ImportJob.objects.create(file_name='big.xlsx', status='running', streaming=True)
+        jobs._stream_progress(job, 1200)
+        self.assertEqual(jobs.job_progress(job)['rows_processed'], 1200)
+        self.assertEqual(jobs.job_progress(job)['rows_total'], 1200)
+
+@override_settings(CONFIG_VERSION_CHECK_SECONDS=0, DATASET_VERSION_CHECK_SECONDS=0)
+class UpsertTests(TestCase):
+    def setUp(self):
+        reset_process_state()
+        self.addCleanup(reset_process_state)
+
+    def test_upsert_counts(self):
+        records = project_records(n=10)
+        first = import_projects(records)
+        self.assertEqual((first['created'], first['updated'], first['unchanged'], first['removed']), (10, 0, 0, 0))
+
+        again = import_projects(records)
+        self.assertEqual((again['created'], again['updated'], again['unchanged'], again['removed']), (0, 0, 10, 0))
+        self.assertEqual(again['generation'], first['generation'], "a no-op import must not start a generation")
+
+        changed = [dict(r) for r in records[:8]]
+        changed[0]['project_name'] = 'Renamed'
+        changed.append({**records[0], 'project_code': 'TP-NEW'})
+        summary = import_projects(changed, retire_missing=True)
+        self.assertEqual((summary['created'], summary['updated'], summary['unchanged'], summary['removed']), (1, 1, 7, 2))
+        self.assertEqual(summary['generation'], first['generation'] + 1)
+        self.assertEqual(Project.objects.count(), 9)
+        self.assertEqual(Project.objects.get(project_code='TP-000').project_name, 'Renamed')
+
+        replaced = import_projects(records[:3], mode='replace')
+        self.assertEqual((replaced['created'], replaced['removed']), (3, 9))
+        self.assertEqual(Project.objects.count(), 3)
+
+# ==============================================================================
+# SECTION 3: RESPONSE CACHE & ETAGS
+# ==============================================================================
+
+class ConditionalGetTests(AnalyticsTestCase):
+    def test_if_none_match_gets_304(self):
+        params = {'view': 'Sales', 'start': '2024-01-01', 'end': '2024-12-31'}
+        for url in ('/report/', '/export/'):
+            first = self.client.get(url, params)
+            self.assertEqual(first.status_code, 200)
+            self.assertTrue(first.has_header('ETag'))
+
+            again = self.client.get(url, params, HTTP_IF_NONE_MATCH=first['ETag'])
+            self.assertEqual(again.status_code, 304)
+
+            bump_version(DATASET)
+            stale = self.client.get(url, params, HTTP_IF_NONE_MATCH=first['ETag'])
+            self.assertEqual(stale.status_code, 200, "a new generation must change the ETag")
+
+    @override_settings(CONFIG_VERSION_CHECK_SECONDS=60, DATASET_VERSION_CHECK_SECONDS=60)
+    def test_conditional_get_cost(self):
+        first = self.client.get('/report/')
+        self.assertEqual(first.status_code, 200)
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, first.cookies, "an untouched session must not be saved")
+
+        # No session cookie: generation and config come from process memory
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/report/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+        # With a session cookie, only the session row is read (and nothing is written back)
+        params = {'start': '2024-01-01', 'end': '2024-12-31', 'sbu': SBUS}
+        first = self.client.get('/report/', params)
+        self.assertIn(settings.SESSION_COOKIE_NAME, self.client.cookies)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/report/', params, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+    def test_a_local_publish_is_seen_at_once(self):
+        with override_settings(DATASET_VERSION_CHECK_SECONDS=60):
+            before = versioning.get_generation()
+            with self.captureOnCommitCallbacks(execute=True):
+                summary = import_projects(project_records(n=3, seed=5), retire_missing=True)
+            self.assertEqual(versioning.get_generation(), summary['generation'])
+            self.assertGreater(summary['generation'], before)
+
+class PageKeyTests(AnalyticsTestCase):
+    def page_key(self, data=None, session=None):
+        return views._analytics_page_key(analytics_request(data=data, session=session), 'dashboard_view')
+
+    def test_key_follows_generation_config_and_session(self):
+        session = SessionStore()
+        base = self.page_key(session=session)
+        self.assertEqual(self.page_key(session=session), base)
+
+        bump_version(DATASET)
+        after_publish = self.page_key(session=session)
+        self.assertNotEqual(after_publish, base)
+
+        metric = Metric.objects.first()
+        metric.min_threshold += 1
+        metric.save()
+        self.assertEqual(get_config().version, get_version(CONFIG))
+        after_config = self.page_key(session=session)
+        self.assertNotEqual(after_config, after_publish)
+
+        session['threshold_overrides'] = {metric.field_name: 4.0}
+        self.assertNotEqual(self.page_key(session=session), after_config)
+
+    def test_equivalent_requests_share_a_key(self):
+        session = SessionStore()
+        self.assertEqual(self.page_key({'sbu': ['North', 'South']}, session), self.page_key({'sbu': ['South', 'North']}, session))
+
+# ==============================================================================
+# SECTION 4: PROJECT STORE & MATERIALIZED SCORES
+# ==============================================================================
+
+class StoreTests(AnalyticsTestCase):
+    def assertStoreMatchesOrm(self, thresholds_for):
+        for view_mode in SEEDED_METRICS:
+            with self.subTest(view=view_mode):
+                store_counts = self.stage_counts(view_mode, thresholds_for)
+                with self.orm_only():
+                    self.assertEqual(store_counts, self.stage_counts(view_mode, thresholds_for))
+
+    def test_mask_counts_match_orm_counts(self):
+        values = sorted(set(METRIC_VALUES))
+        midpoints = [(a + b) / 2 for a, b in zip(values, values[1:])]
+        self.assertStoreMatchesOrm(lambda field: values + midpoints + [-1, 100])
+
+    def test_counts_agree_at_threshold_boundaries(self):
+        # Thresholds a hair above / below stored values (e.g. 0.1 + 0.2 against a stored 0.3)
+        # must not round onto them on either path
+        values = sorted(set(METRIC_VALUES))
+        edges = [np.nextafter(v, direction) for v in values for direction in (-np.inf, np.inf)]
+        self.assertStoreMatchesOrm(lambda field: values + edges + [0.1 + 0.2, 1.1 * 3])
+
+    def test_store_follows_the_generation(self):
+        store = project_store.get_project_store()
+        self.assertEqual(store.size, Project.objects.count())
+        import_projects(project_records(n=5, seed=99), retire_missing=True)
+        self.assertEqual(project_store.get_project_store().size, 5)
+
+class CardTests(AnalyticsTestCase):
+    def card(self, url, view_mode, stage, field, threshold, **extra):
+        start_dt, end_dt = STAGE_WINDOWS[view_mode]
+        params = {'view': view_mode, 'start': str(start_dt), 'end': str(end_dt), 'sbu': SBUS[:3],
+                  'stage': stage.lower(), 'field': field, 'threshold': threshold, 'page_size': 200, **extra}
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_card_count_and_rows_match_the_dashboard_count(self):
+        thresholds = [0.3, 0.1 + 0.2, 1 / 3, 1, 2.5]
+        for view_mode, fields in SEEDED_METRICS.items():
+            counts = self.stage_counts(view_mode, lambda field: thresholds)
+            stages = ('Post',) if view_mode == 'Operations' else ('Pre', 'Post')
+            for stage in stages:
+                for field in fields:
+                    for t in thresholds:
+                        with self.subTest(view=view_mode, stage=stage, field=field, threshold=t):
+                            listed = self.card('/cards/projects/', view_mode, stage, field, t)
+                            recomputed = self.card('/cards/recompute/', view_mode, stage, field, t)
+                            self.assertEqual(listed['count'], counts[(stage, field, t)])
+                            self.assertEqual(recomputed['count'], counts[(stage, field, t)])
+                            self.assertEqual(recomputed['stage_total'], counts[(stage, 'total')])
+                            self.assertEqual(len(listed['results']), listed['count'])
+                            self.assertTrue(all(r['value'] >= t for r in listed['results']))
+
+    def test_store_pages_match_orm_pages(self):
+        for sort in views.CARD_PROJECT_SORTS:
+            with self.subTest(sort=sort):
+                args = ('/cards/projects/', 'Design', 'Post', 'renders', 0.5)
+                store_pages = [self.card(*args, sort=sort, page=p, page_size=7) for p in (1, 2, 3)]
+                with self.orm_only():
+                    orm_pages = [self.card(*args, sort=sort, page=p, page_size=7) for p in (1, 2, 3)]
+                key = lambda page: [(r['project_name'], r['project_code'], r['value']) for r in page['results']]
+                self.assertEqual([key(p) for p in store_pages], [key(p) for p in orm_pages])
+                self.assertEqual(store_pages[0]['count'], orm_pages[0]['count'])
+
+class MaterializedScoreTests(AnalyticsTestCase):
+    def leaderboards(self, group):
+        valid_metrics, stage_totals = scoring_context(group, dict(get_config().min_thresholds))
+        request = analytics_request()
+        return views._leaderboard_totals(request, group, SBUS, date(2024, 1, 1), date(2024, 12, 31),
+                                         'sales_lead', valid_metrics, stage_totals)
+
+    def test_materialized_scores_match_live_scores(self):
+        self.assertGreater(refresh_project_scores(), 0)
+        for group in get_config().groups:
+            with self.subTest(group=group.name):
+                materialized = self.leaderboards(group)
+                self.assertTrue(ProjectScore.objects.filter(user_group_id=group.pk).exists())
+                with mock.patch.object(views, '_materialized_scores', return_value=None):
+                    live = self.leaderboards(group)
+                    with self.orm_only():
+                        orm = self.leaderboards(group)
+                rounded = lambda rows: [(r['name'], round(r['total_score'], 1)) for r in rows]
+                self.assertEqual(rounded(materialized), rounded(live))
+                self.assertEqual(rounded(live), rounded(orm))
+
+    def test_stale_scores_are_not_read(self):
+        refresh_project_scores()
+        group = get_config().groups[0]
+        valid_metrics, stage_totals = scoring_context(group, dict(get_config().min_thresholds))
+        self.assertIsNotNone(views._materialized_scores(analytics_request(), group, valid_metrics, stage_totals))
+        bump_version(DATASET)
+        self.assertIsNone(views._materialized_scores(analytics_request(), group, valid_metrics, stage_totals))
+
+class OutOfAdminEditTests(AnalyticsTestCase):
+    """ Saves / deletes from the shell or a management command keep the store and scores current. """
+    def score_rows(self):
+        return sorted(ProjectScore.objects.values_list('project_id', 'user_group_id', 'config_hash', 'score', 'stage_bucket'))
+
+    def assertDerivedDataCurrent(self):
+        generation = get_version(DATASET)
+        store = project_store._store
+        self.assertEqual(store.generation, generation)
+        self.assertEqual(store.ids.tolist(), list(Project.objects.order_by('pk').values_list('pk', flat=True)))
+        self.assertEqual(set(ScoreSet.objects.values_list('generation', flat=True)), {generation})
+
+        incremental = self.score_rows()
+        ProjectScore.objects.all().delete()
+        ScoreSet.objects.all().delete()
+        refresh_project_scores()
+        self.assertEqual(incremental, self.score_rows())
+
+    def test_save_and_delete_refresh_store_and_scores(self):
+        refresh_project_scores()
+        project_store.get_project_store()
+
+        project = Project.objects.get(project_code='TP-001')
+        project.renders = 9.5
+        with self.captureOnCommitCallbacks(execute=True):
+            project.save()
+        store = project_store._store
+        self.assertEqual(store.metrics['renders'][store.ids.tolist().index(project.pk)], 9.5)
+        self.assertDerivedDataCurrent()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.get(project_code='TP-002').delete()
+        self.assertDerivedDataCurrent()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.filter(project_code__in=['TP-003', 'TP-004']).delete()
+        self.assertDerivedDataCurrent()
+        self.assertEqual(DatasetChange.objects.filter(generation=get_version(DATASET)).count(), 1)
+
+# ==============================================================================
+# SECTION 5: PEOPLE FILTER
+# ==============================================================================
+
+class PeopleTests(AnalyticsTestCase):
+    def test_split_and_key(self):
+        self.assertEqual(split_people('a@x.com, B   Name / c;'), ['a@x.com', 'B Name', 'c'])
+        self.assertEqual(split_people(None), [])
+        self.assertEqual(person_key('  Alice   A '), 'alice a')
+
+    def test_filter_matches_whole_tokenized_names(self):
+        def codes(role, selected):
+            return set(Project.objects.filter(assigned_to_q(role, selected)).values_list('project_code', flat=True))
+
+        alice = {r['project_code'] for r in project_records() if (r['sales_lead'] or '').lower() == 'alice a'}
+        carol = {r['project_code'] for r in project_records() if 'carol c' in (r['sales_lead'] or '').lower()}
+        self.assertTrue(alice and carol)
+        self.assertEqual(codes('sales_lead', ['ALICE A']), alice)
+        self.assertEqual(codes('sales_lead', ['Carol C']), carol)
+        self.assertEqual(codes('sales_lead', ['Alice A, Carol C']), alice | carol)
+        self.assertEqual(codes('sales_lead', ['alice']), set())
+        self.assertEqual(codes('ops_pm', ['Carol C']), set())
+
+    def test_deleting_a_project_removes_its_assignments(self):
+        project = Project.objects.filter(sales_lead__isnull=False).first()
+        self.assertTrue(project.assignments.exists())
+        project.delete()
+        self.assertFalse(ProjectAssignment.objects.filter(project_id=project.pk).exists())
+
+        Project.objects.filter(sbu='North').delete()
+        self.assertFalse(ProjectAssignment.objects.exclude(project__in=Project.objects.all()).exists())
+
+    def test_bulk_delete_removes_assignments(self):
+        self.assertEqual(delete_projects(Project.objects.filter(sbu='South')), len([r for r in project_records() if r['sbu'] == 'South']))
+        self.assertFalse(ProjectAssignment.objects.exclude(project__in=Project.objects.all()).exists())
+
+# ==============================================================================
+# SECTION 6: QUERY PLANS
+# ==============================================================================
+
+class QueryPlanTests(AnalyticsTestCase):
+    def test_analytics_queries_use_an_index(self):
+        # The checks of the check_query_plans command, on the test database
+        command = check_query_plans.Command()
+        checked = 0
+        for name, queryset in command._queries(check_query_plans.DEFAULT_SBUS, 30):
+            with self.subTest(query=name):
+                plan = command._explain(queryset)
+                self.assertEqual(check_query_plans.full_scans(plan, connection.vendor), [], plan)
+                checked += 1
+        self.assertGreaterEqual(checked, 6)
+
+    def test_full_scans_are_detected(self):
+        plan = Project.objects.filter(project_name='nothing').explain()
+        self.assertEqual(check_query_plans.full_scans(plan, connection.vendor), [Project._meta.db_table])
@@ -6,7 +6,12 @@ from . import views
 urlpatterns = [
     # --- Dashboard & Ingestion ---
     path('', views.dashboard_view, name='dashboard'),
+    path('cards/projects/', views.card_projects_view, name='card_projects'),
+    path('cards/sweep/', views.card_sweep_view, name='card_sweep'),
+    path('cards/recompute/', views.card_recompute_view, name='card_recompute'),
     path('upload/', views.upload_view, name='upload'),
+    path('upload/jobs/<int:job_id>/', views.import_job_status_view, name='import_job_status'),
+    path('cache/stats/', views.response_cache_stats_view, name='response_cache_stats'),
 
     # --- Live Reporting ---
     path('report/', views.report_view, name='report'),
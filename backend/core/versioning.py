@@ -0,0 +1,93 @@
+# core/versioning.py
+import threading
+import time
+
+from django.conf import settings                    # type: ignore
+from django.db import transaction                   # type: ignore
+from django.db.models import F                      # type: ignore
+from django.utils import timezone                   # type: ignore
+
+from .models import DataVersion, DatasetChange
+
+DATASET = 'dataset'
+CONFIG = 'config'
+SCORES = 'scores'
+
+# Logged single-edit generations are kept this long (a process further behind reloads everything)
+DATASET_CHANGE_LOG_GENERATIONS = 100
+
+def get_version(scope):
+    """
+        Current value of a version counter (0 if it was never bumped).
+    """
+    version = DataVersion.objects.filter(scope=scope).values_list('version', flat=True).first()
+    return version or 0
+
+def bump_version(scope):
+    """
+        Atomically increments a version counter and returns the new value.
+        Call inside the transaction that publishes the change so both commit together.
+    """
+    with transaction.atomic():
+        updated = DataVersion.objects.filter(scope=scope).update(version=F('version') + 1, updated_at=timezone.now())
+        if not updated:
+            DataVersion.objects.get_or_create(scope=scope)
+            DataVersion.objects.filter(scope=scope).update(version=F('version') + 1, updated_at=timezone.now())
+        if scope == DATASET: transaction.on_commit(invalidate_generation)
+    return get_version(scope)
+
+# The dataset generation as seen by readers is held per process, like caches.get_config()'s snapshot:
+# re-read at most every DATASET_VERSION_CHECK_SECONDS, so a conditional GET or a response cache hit
+# needs no query. A bump in this process is seen as soon as it commits.
+
+_generation_lock = threading.Lock()
+_generation = None
+_generation_checked_at = 0.0
+
+def get_generation():
+    """
+        Current dataset generation as this process last read it.
+    """
+    global _generation, _generation_checked_at
+    generation = _generation
+    interval = getattr(settings, 'DATASET_VERSION_CHECK_SECONDS', 5)
+    if generation is not None and time.monotonic() - _generation_checked_at < interval:
+        return generation
+
+    with _generation_lock:
+        if _generation is None or time.monotonic() - _generation_checked_at >= interval:
+            _generation = get_version(DATASET)
+            _generation_checked_at = time.monotonic()
+        return _generation
+
+def invalidate_generation():
+    """
+        Makes the next get_generation() in this process read the version again.
+    """
+    global _generation_checked_at
+    _generation_checked_at = 0.0
+
+def record_dataset_change(project_ids=None):
+    """
+        Bumps the dataset generation for an edit outside the importer and logs the projects it
+        touched (None: not logged, so every reader reloads everything). Call inside the edit's
+        transaction. Returns the new generation.
+    """
+    with transaction.atomic():
+        generation = bump_version(DATASET)
+        if project_ids is not None:
+            DatasetChange.objects.bulk_create([DatasetChange(generation=generation, project_id=pk) for pk in set(project_ids)])
+            DatasetChange.objects.filter(generation__lte=generation - DATASET_CHANGE_LOG_GENERATIONS).delete()
+    return generation
+
+def changed_projects(since, until):
+    """
+        Ids of the projects changed after dataset generation since, up to until: a set, or None when
+        one of those generations was not a logged edit (an import), so everything must be reloaded.
+    """
+    if until <= since: return set()
+    generations, project_ids = set(), set()
+    for generation, pk in DatasetChange.objects.filter(generation__gt=since, generation__lte=until).values_list('generation', 'project_id'):
+        generations.add(generation)
+        project_ids.add(pk)
+    return project_ids if len(generations) == until - since else None
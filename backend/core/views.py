@@ -1,17 +1,32 @@
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from io import BytesIO
+from urllib.parse import urlencode
 from collections import defaultdict
+from functools import wraps
+import hashlib
 import json     # for Chart.js
 
 from django.shortcuts import render, redirect, get_object_or_404            # type: ignore
 from django.contrib import messages                                         # type: ignore
-from django.http import HttpResponse                                        # type: ignore
-from django.db.models import Q                                              # type: ignore
+from django.http import HttpResponse, JsonResponse                          # type: ignore
+from django.urls import reverse                                             # type: ignore
+from django.contrib.admin.views.decorators import staff_member_required     # type: ignore
+from django.db.models import Q, F, Count, Min, Sum                          # type: ignore
+from django.db.models.functions import Lower, Trim                          # type: ignore
+from django.views.decorators.http import condition                          # type: ignore
 
 from .forms import UploadFileForm
-from .models import Project, Metric, Department, UserGroup
-from .constants import EXCEL_COL_MAP, ROLE_CONFIG, DEPT_PEOPLE_MAP, REPORT_ORDER_CONFIG, COMMON_REPORT_COLS
+from .models import Project, ProjectScore, UserGroup, ImportJob
+from .jobs import enqueue_import, job_progress
+from .caches import TEST_PROJECT_CODE, get_filter_options, get_config
+from .caches import response_cache_enabled, response_cache_key, get_cached_response, cache_response, response_cache_stats
+from .store import get_project_store
+from .people import assigned_to_q
+from .scores import scoring_context, score_hash, has_scores
+from .versioning import get_generation
+from .constants import ROLE_CONFIG, DEPT_PEOPLE_MAP, REPORT_ORDER_CONFIG, COMMON_REPORT_COLS
 
 # ==============================================================================
 # SECTION 1: GLOBAL HELPER SERVICES (Business Logic)
@@ -21,16 +36,12 @@ def _handle_threshold_session(request):
         Captures threshold changes from URL and saves them to Session.
         Returns a dictionary of {field_name: effective_value} merging Session > DB Defaults.
     """
-    # 1. Initialize session storage if missing
-    if 'threshold_overrides' not in request.session:
+    # 1. Check for Reset Flag (the session is only written when it changes: an untouched
+    #    session is never saved, and a request without a cookie never creates one)
+    if request.GET.get('reset_thresholds') and request.session.get('threshold_overrides'):
         request.session['threshold_overrides'] = {}
-
-    # 2. Check for Reset Flag
-    if request.GET.get('reset_thresholds'):
-        request.session['threshold_overrides'] = {}
-        request.session.modified = True
     
-    # 3. Capture new changes from GET params
+    # 2. Capture new changes from GET params
     # Format expected: 'thresh_pre_field_name' or 'thresh_post_field_name'
     for key, value in request.GET.items():
         if key.startswith('thresh_') and value:
@@ -40,22 +51,21 @@ def _handle_threshold_session(request):
                 # or we just map by field name since fields are unique in models mostly.
                 parts = key.split('_', 2) # thresh, pre/post, field_name
                 if len(parts) >= 3:
-                    field_name = parts[2]
-                    request.session['threshold_overrides'][field_name] = float(value)
-                    request.session.modified = True
+                    _save_threshold_override(request, parts[2], value)
             except ValueError:
                 continue
-    # 4. Build Final Map (Session > DB Default)
-    # We fetch all metrics to get defaults
-    final_map = {}
-    all_metrics = Metric.objects.all()
-    for m in all_metrics:
-        # Default to the DB 'min_threshold' if no session override exists
-        # If your model hasn't been migrated yet, use 0.0 as fallback
-        db_min = getattr(m, 'min_threshold', 0.0) 
-        final_map[m.field_name] = request.session['threshold_overrides'].get(m.field_name, db_min)
-    
-    return final_map
+    # 3. Build Final Map (Session > DB Default)
+    # Defaults come from the in-process config snapshot (no query)
+    overrides = request.session.get('threshold_overrides', {})
+    return {field: overrides.get(field, db_min) for field, db_min in get_config().min_thresholds.items()}
+
+def _save_threshold_override(request, field_name, value):
+    """ 
+        Remembers a threshold override for field_name in the session (Session > DB Default). 
+    """
+    overrides = request.session.get('threshold_overrides', {})
+    if overrides.get(field_name) != float(value):
+        request.session['threshold_overrides'] = {**overrides, field_name: float(value)}
 
 def _get_request_params(request):
     """ 
@@ -72,14 +82,14 @@ def _get_request_params(request):
     # 2. DATE LOGIC (Priority: URL > Session > Default)
     if request.GET.get('start'):
         start_str = request.GET.get('start')
-        request.session['filter_start'] = start_str 
+        if request.session.get('filter_start') != start_str: request.session['filter_start'] = start_str
     else:
         start_str = request.session.get('filter_start', default_start) 
 
 
     if request.GET.get('end'):
         end_str = request.GET.get('end')
-        request.session['filter_end'] = end_str 
+        if request.session.get('filter_end') != end_str: request.session['filter_end'] = end_str
     else:
         end_str = request.session.get('filter_end', default_end) 
 
@@ -87,7 +97,7 @@ def _get_request_params(request):
     # 3. SBU LOGIC (Priority: URL > Session > Default)
     if 'sbu' in request.GET:
         sbu_filter = request.GET.getlist('sbu')
-        request.session['filter_sbu'] = sbu_filter # Save new selection
+        if request.session.get('filter_sbu') != sbu_filter: request.session['filter_sbu'] = sbu_filter # Save new selection
     elif 'view' in request.GET: 
         # Switching departments? Keep previous selection or fall back to SME defaults
         sbu_filter = request.session.get('filter_sbu', sme_defaults)
@@ -123,6 +133,7 @@ def _fetch_projects_filtered(sbu_filter, start_dt, end_dt, project_field=None):
     """ 
         Centralized Project Fetcher. 
         Applies SBU, Date Range, Role Filter, and CRITICAL Test Project Exclusion.
+        Rows come back in primary-key order, once each.
     """
     projects = Project.objects.filter(sbu__in=sbu_filter)
 
@@ -136,50 +147,13 @@ def _fetch_projects_filtered(sbu_filter, start_dt, end_dt, project_field=None):
                        .exclude(project_code__exact="")\
                        .exclude(project_code="PS-02AUG23-BB1_TEST-SOMERSET-01")
 
-    # 3. Date Logic: Login Date OR Start Date must be in range
-    projects = projects.filter(
-        Q(login_date__range=[start_dt, end_dt]) | 
-        Q(start_date__range=[start_dt, end_dt])
-    ).distinct()
-    
-    return projects
+    # 3. Date Logic: Login Date OR Start Date must be in range.
+    # Each half is its own indexed range scan ((sbu, login_date) / (sbu, start_date)); UNION merges
+    # the ids, so no DISTINCT is needed (nothing is joined, every project appears once).
+    by_login = projects.filter(login_date__range=[start_dt, end_dt]).values('pk')
+    by_start = projects.filter(start_date__range=[start_dt, end_dt]).values('pk')
 
-def _get_scoring_engine_context(user_group, threshold_map):
-    """ 
-        Prepares Metrics & Weights for Scoring. 
-    """
-    metrics = Metric.objects.filter(
-        metricweight__user_group=user_group, 
-        metricweight__factor__gt=0
-    ).distinct()
-    
-    stage_totals = {}
-    valid_metrics = []
-
-    for m in metrics:
-        # We calculate the "Total Possible" based on the Max Threshold (Cap)
-        # Assuming Max Threshold IS the max credits possible for that metric
-        db_min = getattr(m, 'min_threshold', 1.0)
-        db_max = getattr(m, 'max_threshold', 10.0)
-
-        max_points = db_max
-        
-        stage_totals[m.stage] = stage_totals.get(m.stage, 0) + max_points
-
-        # DASHBOARD OVERRIDE LOGIC:
-        # If user changed threshold in Dashboard, it overrides the MINIMUM threshold.
-        # Default falls back to DB min_threshold.
-        effective_min = threshold_map.get(m.field_name, db_min)
-
-        valid_metrics.append({
-            'field': m.field_name, 
-            'label': m.label,
-            'stage': m.stage, 
-            'min': effective_min,          
-            'max': db_max,        
-            'weight_factor': max_points    
-        })
-    return valid_metrics, stage_totals
+    return Project.objects.filter(pk__in=by_login.union(by_start)).order_by('pk')
 
 def _calculate_project_score(project, valid_metrics, stage_totals):
     """ 
@@ -188,8 +162,7 @@ def _calculate_project_score(project, valid_metrics, stage_totals):
       - If Min <= Actual <= Max: (Actual - Min) Pts
       - If Actual > Max: Max Pts (Capped)
     """
-    raw_stage = str(project.stage).strip().lower()
-    current_stage = 'Post' if any(x in raw_stage for x in ['post', 'exec', 'ops', 'handover']) else 'Pre'
+    current_stage = project.stage_bucket    # precomputed at import (models.stage_bucket_for)
 
     total_possible = stage_totals.get(current_stage, 0)
     earned_points = 0.0
@@ -219,6 +192,77 @@ def _calculate_project_score(project, valid_metrics, stage_totals):
                 
     return round(earned_points, 1), current_stage
 
+def _materialized_scores(request, user_group, valid_metrics, stage_totals):
+    """ 
+        The group's precomputed ProjectScore rows matching this request's scoring context, or None 
+        (not refreshed yet, or session thresholds that differ from the DB defaults): score live then. 
+    """
+    h = score_hash(user_group, valid_metrics, stage_totals)
+    if not has_scores(h, user_group, _get_generation(request)): return None
+    return ProjectScore.objects.filter(config_hash=h, user_group_id=user_group.pk)
+
+def _score_projects(request, user_group, sbu_filter, start_dt, end_dt, project_field, valid_metrics, stage_totals):
+    """ 
+        Scores every project _fetch_projects_filtered would return: read from the materialized score 
+        table when it is current, else computed (vectorized over the project store when it is enabled). 
+        Returns [(person, project_code, project_name, sbu, score, stage)], in primary-key order.
+    """
+    materialized = _materialized_scores(request, user_group, valid_metrics, stage_totals)
+    if materialized is not None:
+        return list(materialized.filter(project__in=_fetch_projects_filtered(sbu_filter, start_dt, end_dt, project_field))
+                                .order_by('project_id')
+                                .values_list(f'project__{project_field}', 'project__project_code', 'project__project_name',
+                                             'project__sbu', 'score', 'stage_bucket'))
+
+    store = _get_project_store(request)
+    if store is None:
+        scored = []
+        for proj in _fetch_projects_filtered(sbu_filter, start_dt, end_dt, project_field):
+            score, stage = _calculate_project_score(proj, valid_metrics, stage_totals)
+            scored.append((getattr(proj, project_field), proj.project_code, proj.project_name, proj.sbu, score, stage))
+        return scored
+
+    mask = store.isin('sbu', sbu_filter) & store.not_blank(project_field) & store.not_blank('project_code')
+    mask &= ~store.equals('project_code', TEST_PROJECT_CODE)
+    mask &= store.between('login_date', start_dt, end_dt) | store.between('start_date', start_dt, end_dt)
+    index = mask.nonzero()[0]
+
+    scores, is_post = store.scores(index, valid_metrics, stage_totals)
+    return [
+        (person, code, name, sbu, round(score, 1), 'Post' if post else 'Pre')
+        for person, code, name, sbu, score, post in zip(
+            store.values(project_field, index), store.values('project_code', index),
+            store.values('project_name', index), store.values('sbu', index), scores.tolist(), is_post.tolist()
+        )
+    ]
+
+def _leaderboard_totals(request, user_group, sbu_filter, start_dt, end_dt, project_field, valid_metrics, stage_totals):
+    """ 
+        Total score per person (case-insensitive), best first; ties keep the order people first appear in. 
+        One GROUP BY over the materialized scores when they are current. Returns [{'name', 'total_score'}].
+    """
+    materialized = _materialized_scores(request, user_group, valid_metrics, stage_totals)
+    if materialized is not None:
+        person = f'project__{project_field}'
+        rows = list(materialized.filter(project__in=_fetch_projects_filtered(sbu_filter, start_dt, end_dt, project_field))
+                                .annotate(person_key=Lower(Trim(person))).values('person_key')
+                                .annotate(total_score=Sum('score'), first_seen=Min('project_id'))
+                                .order_by('-total_score', 'first_seen')
+                                .values_list('first_seen', 'total_score'))
+        # Display the spelling of each person's first project, as the live paths do (one pk lookup)
+        names = dict(Project.objects.filter(pk__in=[pk for pk, _ in rows]).values_list('pk', project_field))
+        return [{'name': names[pk], 'total_score': total} for pk, total in rows]
+
+    totals = {}
+    for user_email, _, _, _, score, _ in _score_projects(request, user_group, sbu_filter, start_dt, end_dt, project_field, valid_metrics, stage_totals):
+        if not user_email: continue
+        user_key = str(user_email).strip().lower()
+        if user_key not in totals:
+            totals[user_key] = {'name': user_email, 'total_score': 0}
+
+        totals[user_key]['total_score'] += score
+    return sorted(totals.values(), key=lambda x: x['total_score'], reverse=True)
+
 def group_roles_by_dept(flat_roles):
     """
         Helper: Groups a list of role names into specific Departments in a specific order for Dropdown menus.
@@ -258,59 +302,62 @@ def _fetch_metrics_from_db(view_mode, stage, role_filter, threshold_map):
     """ 
         Fetches dashboard metrics and determines primary/secondary visibility. 
     """
-    try:
-        dept = Department.objects.get(name__iexact=view_mode)
-    except Department.DoesNotExist:
-        return []
-
-    metrics_qs = Metric.objects.filter(department=dept, stage=stage)\
-                               .prefetch_related('visible_to_groups', 'metricweight_set__user_group')
+    config = get_config()
+    group_names = {g.pk: g.name for g in config.groups}
 
     metrics_list = []
-    for m in metrics_qs:
+    for m in config.metrics_for(view_mode, stage):
         # Combine Legacy Groups + Weighted Groups
-        m2m_groups = {g.name for g in m.visible_to_groups.all()}
-        weight_groups = {w.user_group.name for w in m.metricweight_set.all() if w.factor > 0}
-        allowed_groups = list(m2m_groups | weight_groups)
+        weight_groups = {group_names[pk] for pk, factor in m.weights.items() if factor > 0}
+        allowed_groups = list(m.visible_to | weight_groups)
 
-        db_min = getattr(m, 'min_threshold', 0.0)
-        effective_val = threshold_map.get(m.field_name, db_min)
+        effective_val = threshold_map.get(m.field_name, m.min_threshold)
         
         metrics_list.append({   
             'label': m.label,
             'field': m.field_name,
             'def': effective_val,
-            'success_cat': m.success_metric.name if m.success_metric else None,
-            'success_color': m.success_metric.color if m.success_metric else 'secondary', 
+            'success_cat': m.success_cat,
+            'success_color': m.success_color, 
             'allowed_groups': allowed_groups, 
             'id': m.pk 
         })
     return metrics_list
 
+def _people_filter_params(view_mode):
+    """ 
+        (db_field, GET param) pairs of the people filters shown for this view. 
+    """
+    # Use DEPT_PEOPLE_MAP to determine which fields to filter for this view
+    for db_field, label in DEPT_PEOPLE_MAP.get(view_mode, []):
+        # Construct the f_ prefix parameter key based on the db_field name
+        # Logic: 'sales_head' -> 'f_s_head', 'ops_pm' -> 'f_o_pm'
+        parts = db_field.split('_')
+        if len(parts) == 2:
+            prefix = parts[0][0] # 'sales' -> 's'
+            suffix = parts[1]    # 'head' -> 'head'
+            yield db_field, f"f_{prefix}_{suffix}"
+
 def _apply_people_filters(queryset, view_mode, request):
     """ 
         Dynamic Filtering based on View Mode (e.g. Sales Head filter). 
+        Matches whole people (as tokenized at import) through the indexed assignments table.
     """
-    def _filter(qs, db_field, get_param):
-        selected = request.GET.getlist(get_param)
-        if not selected: return qs
-        q = Q()
-        for name in selected: q |= Q(**{f"{db_field}__icontains": name})
-        return qs.filter(q)
-
-    # Use DEPT_PEOPLE_MAP to determine which fields to filter for this view
-    if view_mode in DEPT_PEOPLE_MAP:
-        for db_field, label in DEPT_PEOPLE_MAP[view_mode]:
-            # Construct the f_ prefix parameter key based on the db_field name
-            # Logic: 'sales_head' -> 'f_s_head', 'ops_pm' -> 'f_o_pm'
-            parts = db_field.split('_')
-            if len(parts) == 2:
-                prefix = parts[0][0] # 'sales' -> 's'
-                suffix = parts[1]    # 'head' -> 'head'
-                param = f"f_{prefix}_{suffix}"
-                queryset = _filter(queryset, db_field, param)
+    for db_field, param in _people_filter_params(view_mode):
+        selected = request.GET.getlist(param)
+        if selected: queryset = queryset.filter(assigned_to_q(db_field, selected))
     return queryset
 
+def _store_people_mask(store, view_mode, request):
+    """ 
+        _apply_people_filters as a project store mask. 
+    """
+    mask = store.everything()
+    for db_field, param in _people_filter_params(view_mode):
+        selected = request.GET.getlist(param)
+        if selected: mask &= store.assigned_any(db_field, selected)
+    return mask
+
 def _get_stage_querysets(view_mode, projects, start_dt, end_dt, roll_start, roll_end):
     """ 
         Splits projects into Pre/Post buckets. 
@@ -326,33 +373,110 @@ def _get_stage_querysets(view_mode, projects, start_dt, end_dt, roll_start, roll
         qs_post = projects.filter(login_date__gte=start_dt, login_date__lte=end_dt, stage='Post Sales')
     elif view_mode == 'Design':
         qs_pre = projects.filter(login_date__gte=start_dt, login_date__lte=end_dt, stage="Pre Sales")
-        qs_post = projects.filter(q_rolling).distinct()
+        qs_post = projects.filter(q_rolling)
     elif view_mode == 'Operations':
-        qs_post = projects.filter(q_rolling).distinct()
+        qs_post = projects.filter(q_rolling)
     
     return qs_pre, qs_post
 
+def _get_stage_masks(store, view_mode, base, start_dt, end_dt, roll_start, roll_end):
+    """ 
+        _get_stage_querysets over the project store: Pre/Post boolean masks within base. 
+    """
+    rolling = store.between('start_date', roll_start, end_dt) & store.between('end_date', start_dt, roll_end)
+    in_login_range = store.between('login_date', start_dt, end_dt)
+
+    pre, post = store.nothing(), store.nothing()
+    if view_mode == 'Sales':
+        pre = base & in_login_range & store.equals('stage', 'Pre Sales')
+        post = base & in_login_range & store.equals('stage', 'Post Sales')
+    elif view_mode == 'Design':
+        pre = base & in_login_range & store.equals('stage', 'Pre Sales')
+        post = base & rolling
+    elif view_mode == 'Operations':
+        post = base & rolling
+
+    return pre, post
+
+def _get_stage_sources(request, view_mode, sbu_filter, start_dt, end_dt, roll_start, roll_end):
+    """ 
+        Pre/Post project sets for the dashboard filters: project store masks, or querysets 
+        when the store is disabled. Count them with _count_metric_hits. 
+    """
+    store = _get_project_store(request)
+    if store is None:
+        projects = Project.objects.filter(sbu__in=sbu_filter).exclude(project_code=TEST_PROJECT_CODE)
+        projects = _apply_people_filters(projects, view_mode, request)
+        return _get_stage_querysets(view_mode, projects, start_dt, end_dt, roll_start, roll_end)
+
+    def build():
+        base = store.isin('sbu', sbu_filter) & ~store.equals('project_code', TEST_PROJECT_CODE)
+        base &= _store_people_mask(store, view_mode, request)
+        return _get_stage_masks(store, view_mode, base, start_dt, end_dt, roll_start, roll_end)
+
+    # Stage membership is reused across requests with the same filters (e.g. threshold edits)
+    people = tuple((param, tuple(sorted(request.GET.getlist(param)))) for _, param in _people_filter_params(view_mode))
+    key = ('stage_masks', view_mode, start_dt, end_dt, roll_start, roll_end, tuple(sorted(set(sbu_filter))), people)
+    return store.memo(key, build)
+
+def _resolve_card_thresholds(request, metrics_list, prefix):
+    """ 
+        Effective threshold per metric: URL 'thresh_<prefix>_<field>' > session/DB default. 
+    """
+    thresholds = []
+    for m in metrics_list:
+        user_input = request.GET.get(f"thresh_{prefix}_{m['field']}")
+        try: thresholds.append(float(user_input) if user_input else m['def'])
+        except: thresholds.append(m['def'])
+    return thresholds
+
+def _aggregate_metric_counts(queryset, metrics_list, thresholds):
+    """ 
+        ONE aggregate query for a whole stage: total projects + a filtered COUNT per metric. 
+        Returns (total, [count per metric]).
+    """
+    aggregates = {'total': Count('pk')}
+    for i, (m, threshold) in enumerate(zip(metrics_list, thresholds)):
+        aggregates[f"m{i}"] = Count('pk', filter=Q(**{f"{m['field']}__gte": threshold}))
+    result = queryset.aggregate(**aggregates)
+    return result['total'] or 0, [result[f"m{i}"] or 0 for i in range(len(metrics_list))]
+
+def _count_metric_hits(request, source, metrics_list, thresholds):
+    """ 
+        (total, [count per metric]) for a set from _get_stage_sources. 
+    """
+    store = _get_project_store(request)
+    if store is None:
+        return _aggregate_metric_counts(source, metrics_list, thresholds)
+    return store.count_at_least(source, [m['field'] for m in metrics_list], thresholds)
+
+def _get_generation(request):
+    """ 
+        Current dataset generation (in-process, see versioning.get_generation), fixed for the whole request. 
+    """
+    if not hasattr(request, '_generation'):
+        request._generation = get_generation()
+    return request._generation
+
+def _get_project_store(request):
+    """ 
+        Columnar project store for this request's generation, or None (ORM fallback) when disabled. 
+    """
+    return get_project_store(_get_generation(request))
+
+def _get_filter_options(request):
+    """ 
+        Dropdown/SBU options for the current dataset generation (shared cache, one lookup per request). 
+    """
+    if not hasattr(request, '_filter_options'):
+        request._filter_options = get_filter_options(_get_generation(request))
+    return request._filter_options
+
 def _get_dropdown_context(request):
     """ 
-        Populates filter dropdowns with unique values from DB. 
+        Populates filter dropdowns with unique values from DB (cached per dataset generation). 
     """
-    def get_opts(field):
-        try:
-            vals = Project.objects.exclude(project_code="PS-02AUG23-BB1_TEST-SOMERSET-01").values_list(field, flat=True).distinct()
-            return sorted([v for v in vals if v and str(v).strip()])
-        except: return []
-
-    people_opts = {
-        'm_head': get_opts('m_head'), 'm_lead': get_opts('m_lead'),
-        's_head': get_opts('sales_head'), 's_lead': get_opts('sales_lead'),
-        'd_dh': get_opts('design_dh'), 'd_dm': get_opts('design_dm'),
-        'd_id': get_opts('design_id'), 'd_3d': get_opts('design_3d'),
-        'o_head': get_opts('ops_head'), 'o_pm': get_opts('ops_pm'),
-        'o_om': get_opts('ops_om'), 'o_ss': get_opts('ops_ss'),
-        'o_mep': get_opts('ops_mep'), 'o_csc': get_opts('ops_csc'),
-        'p_head': get_opts('p_head'), 'p_exec': get_opts('p_exec'), 'p_mgr': get_opts('p_mgr'),
-        'f_head': get_opts('f_head'),
-    }
+    people_opts = _get_filter_options(request)['people']
     
     selected_filters = {
         's_head': request.GET.getlist('f_s_head'), 's_lead': request.GET.getlist('f_s_lead'),
@@ -364,10 +488,79 @@ def _get_dropdown_context(request):
     }
     return people_opts, selected_filters
 
+# GET params that _analytics_cache_params captures through their effective (session-resolved) values
+_EFFECTIVE_PARAMS = ('view', 'start', 'end', 'sbu', 'reset_thresholds')
+# Session keys whose values it already holds in resolved, normalized form
+_RESOLVED_SESSION_KEYS = ('filter_start', 'filter_end', 'filter_sbu')
+
+def _analytics_cache_params(request):
+    """ 
+        Everything an analytics page depends on besides data and config, normalized: session/default 
+        filters resolved, lists sorted, empty params dropped (so '/' and '/?view=Sales' share a page). 
+        The rest of the session, as this request leaves it, is part of it too: a page is never served 
+        to a session whose state differs from the one it was rendered for. 
+    """
+    _handle_threshold_session(request)
+    view_mode, start_str, end_str, start_dt, end_dt, sbu_filter, _, _, _ = _get_request_params(request)
+    others = []
+    for key in sorted(k for k in request.GET if k not in _EFFECTIVE_PARAMS):
+        values = sorted(v for v in request.GET.getlist(key) if v)
+        if values: others.append((key, tuple(values)))
+    return (
+        view_mode, start_str, end_str, str(start_dt), str(end_dt), tuple(sorted(set(sbu_filter))),
+        json.dumps({k: v for k, v in request.session.items() if k not in _RESOLVED_SESSION_KEYS}, sort_keys=True, default=str),
+        tuple(others),
+    )
+
+def _analytics_page_key(request, view_name):
+    """ 
+        Response cache key of this request to view_name (generation + config version + normalized params). 
+        Memoized on the request, so the ETag check and the response cache share one computation. 
+    """
+    keys = request.__dict__.setdefault('_analytics_page_keys', {})
+    if view_name not in keys:
+        keys[view_name] = response_cache_key(view_name, _get_generation(request), get_config().version,
+                                             _analytics_cache_params(request))
+    return keys[view_name]
+
+def analytics_etag(view_name):
+    """ 
+        condition() etag_func: a strong ETag from the page key, so If-None-Match is answered with 
+        304 before the view runs any project query or builds any DataFrame. 
+    """
+    def etag(request, *args, **kwargs):
+        if len(messages.get_messages(request)): return None     # the page would show a flash message
+        return hashlib.sha1(_analytics_page_key(request, view_name).encode()).hexdigest()
+    return etag
+
+def cache_analytics_page(view_func):
+    """ 
+        Serves repeated analytics pages from the response cache (core/caches.py SECTION 4). 
+        Session side effects (filters, threshold overrides) still apply on a hit. 
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        # Pending flash messages are rendered into the page, so those responses are one-offs
+        if request.method != 'GET' or not response_cache_enabled() or len(messages.get_messages(request)):
+            return view_func(request, *args, **kwargs)
+
+        key = _analytics_page_key(request, view_func.__name__)
+        response = get_cached_response(key)
+        if response is not None:
+            response['X-Cache'] = 'HIT'
+            return response
+
+        response = view_func(request, *args, **kwargs)
+        cache_response(key, response)
+        response['X-Cache'] = 'MISS'
+        return response
+    return wrapper
+
 # ==============================================================================
 # SECTION 3: DASHBOARD VIEW
 # ==============================================================================
 
+@cache_analytics_page
 def dashboard_view(request):
     threshold_map = _handle_threshold_session(request)
 
@@ -375,35 +568,22 @@ def dashboard_view(request):
     people_opts, selected_filters = _get_dropdown_context(request)
     
     # 1. Fetch Projects (Exclude Test Project)
-    projects = Project.objects.filter(sbu__in=sbu_filter).exclude(project_code="PS-02AUG23-BB1_TEST-SOMERSET-01")
-    projects = _apply_people_filters(projects, view_mode, request)
-    all_departments = Department.objects.values_list('name', flat=True).order_by('name')
+    all_departments = get_config().departments
 
-    qs_pre, qs_post = _get_stage_querysets(view_mode, projects, start_dt, end_dt, roll_start, roll_end)
-    pre_count = qs_pre.count()
-    post_count = qs_post.count()
+    src_pre, src_post = _get_stage_sources(request, view_mode, sbu_filter, start_dt, end_dt, roll_start, roll_end)
 
-    def calculate_card_metrics(queryset, metrics_list, prefix):
+    def calculate_card_metrics(source, metrics_list, prefix):
+        """ Cards for one stage from ONE aggregate (or store pass). Project lists load on demand (card_projects_view). """
         results_prim, results_sec = [], []
-        
-        for m in metrics_list:
-            param_name = f"thresh_{prefix}_{m['field']}"
-            threshold = m['def']
-            user_input = request.GET.get(param_name)
-            try: threshold = float(user_input) if user_input else m['def']
-            except: threshold = m['def']
-
-            filtered_qs = queryset.filter(**{f"{m['field']}__gte": threshold})
-            count = filtered_qs.count()
-
-            proj_data = list(filtered_qs.values('id', 'project_name', 'project_code').order_by('project_name'))
+        thresholds = _resolve_card_thresholds(request, metrics_list, prefix)
+        total, counts = _count_metric_hits(request, source, metrics_list, thresholds)
 
+        for m, threshold, count in zip(metrics_list, thresholds, counts):
             item = {
-                'label': m['label'], 'param': param_name, 'threshold': threshold, 
-                'count': count, 'field': m['field'], 
+                'label': m['label'], 'param': f"thresh_{prefix}_{m['field']}", 'threshold': threshold, 
+                'count': count, 'field': m['field'], 'stage': prefix,
                 'success_cat': m['success_cat'], 
                 'success_color': m['success_color'], 
-                'project_list': proj_data
             }
 
             # Filter Logic: Is this card primary for the selected role?
@@ -421,19 +601,18 @@ def dashboard_view(request):
             if is_primary: results_prim.append(item)
             else: results_sec.append(item)
                 
-        return results_prim, results_sec
+        return results_prim, results_sec, total
 
     pre_metrics_db = _fetch_metrics_from_db(view_mode, 'Pre', role_filter, threshold_map)
     post_metrics_db = _fetch_metrics_from_db(view_mode, 'Post', role_filter, threshold_map)
 
-    pre_prim, pre_sec = [], []
+    pre_prim, pre_sec, pre_count = [], [], 0
     if view_mode != 'Operations':
-        pre_prim, pre_sec = calculate_card_metrics(qs_pre, pre_metrics_db, 'pre')
+        pre_prim, pre_sec, pre_count = calculate_card_metrics(src_pre, pre_metrics_db, 'pre')
 
-    post_prim, post_sec = [], []
-    post_prim, post_sec = calculate_card_metrics(qs_post, post_metrics_db, 'post')
+    post_prim, post_sec, post_count = calculate_card_metrics(src_post, post_metrics_db, 'post')
 
-    sbu_opts = sorted([s for s in Project.objects.values_list('sbu', flat=True).distinct() if s])
+    sbu_opts = _get_filter_options(request)['sbus']
 
     has_overrides = bool(request.session.get('threshold_overrides'))
     
@@ -445,159 +624,211 @@ def dashboard_view(request):
         'post_prim': post_prim, 'post_sec': post_sec, 'post_count': post_count,
         'all_departments': all_departments,
         'has_overrides': has_overrides,
+        'card_query': _card_filter_query(request, view_mode, start_str, end_str, sbu_filter),
     }
     return render(request, 'core/dashboard.html', context)
 
+def _card_filter_query(request, view_mode, start_str, end_str, sbu_filter):
+    """ 
+        Query string carrying the dashboard filters, so a card's project list matches its count. 
+    """
+    params = [('view', view_mode), ('start', start_str), ('end', end_str)]
+    params += [('sbu', sbu) for sbu in sbu_filter]
+    params += [(k, v) for k in request.GET if k.startswith('f_') for v in request.GET.getlist(k)]
+    return urlencode(params)
+
+CARD_PROJECT_SORTS = {
+    'name': ('project_name', 'project_code'), '-name': ('-project_name', '-project_code'),
+    'code': ('project_code',), '-code': ('-project_code',),
+    'value': ('metric_value', 'project_name'), '-value': ('-metric_value', 'project_name'),
+}
+
+def _resolve_card_metric(request, view_mode):
+    """ 
+        (stage, field, metric) of the card named by the stage/field params; metric is None if unknown. 
+    """
+    stage = 'Post' if request.GET.get('stage') == 'post' else 'Pre'
+    field = request.GET.get('field', '')
+    return stage, field, get_config().find_metric(view_mode, stage, field)
+
+def _sorted_store_rows(store, index, field, ordering):
+    """ 
+        (id, project_name, project_code, metric_value) for the store rows in index, ordered like 
+        order_by(*ordering) on the database (NULLs first when ascending). 
+    """
+    rows = list(zip(store.ids[index].tolist(), store.values('project_name', index),
+                    store.values('project_code', index), store.metrics[field][index].tolist()))
+    columns = {'project_name': 1, 'project_code': 2, 'metric_value': 3}
+    # One stable sort per key, last key first
+    for key in reversed(ordering):
+        col = columns[key.lstrip('-')]
+        rows.sort(key=lambda r: (r[col] is not None, r[col]), reverse=key.startswith('-'))
+    return rows
+
+def _card_project_page(request, view_mode, stage, field, threshold, sbu_filter, start_dt, end_dt, roll_start, roll_end):
+    """ 
+        One page of a card's qualifying projects, sorted per the page/page_size/sort params. 
+        Returns {count, page, page_size, sort, pages, results}. Count and rows both come from the 
+        card's stage set in _get_stage_sources (the memoized store mask the dashboard counts with). 
+    """
+    sort = request.GET.get('sort', 'name')
+    if sort not in CARD_PROJECT_SORTS: sort = 'name'
+    try: page = max(1, int(request.GET.get('page', 1)))
+    except ValueError: page = 1
+    try: page_size = min(200, max(1, int(request.GET.get('page_size', 50))))
+    except ValueError: page_size = 50
+
+    src_pre, src_post = _get_stage_sources(request, view_mode, sbu_filter, start_dt, end_dt, roll_start, roll_end)
+    source = src_post if stage == 'Post' else src_pre
+    offset = (page - 1) * page_size
+
+    store = _get_project_store(request)
+    if store is None:
+        queryset = source.filter(**{f"{field}__gte": threshold})
+        total = queryset.count()
+        rows = queryset.annotate(metric_value=F(field))\
+                       .order_by(*CARD_PROJECT_SORTS[sort])\
+                       .values_list('id', 'project_name', 'project_code', 'metric_value')[offset:offset + page_size]
+    else:
+        index = (source & store.at_least(field, threshold)).nonzero()[0]
+        total = len(index)
+        rows = _sorted_store_rows(store, index, field, CARD_PROJECT_SORTS[sort])[offset:offset + page_size]
+
+    role = request.GET.get('metric_role') or 'All Roles'
+    results = [{
+        'id': pk, 'project_name': name, 'project_code': code, 'value': value,
+        'url': f"{reverse('project_scorecard', args=[code])}?{urlencode({'metric_role': role})}",
+    } for pk, name, code, value in rows]
+
+    return {
+        'count': total, 'page': page, 'page_size': page_size, 'sort': sort,
+        'pages': max(1, -(-total // page_size)), 'results': results,
+    }
+
+def card_projects_view(request):
+    """ 
+        JSON: one dashboard card's qualifying projects, paged and sorted. 
+        Takes the dashboard filters plus stage (pre/post), field, threshold, page, page_size, sort.
+    """
+    view_mode, _, _, start_dt, end_dt, sbu_filter, _, roll_start, roll_end = _get_request_params(request)
+    stage, field, metric = _resolve_card_metric(request, view_mode)
+    if metric is None:
+        return JsonResponse({'error': f"Unknown metric '{field}' for {view_mode} / {stage}."}, status=404)
+
+    try: threshold = float(request.GET['threshold'])
+    except (KeyError, ValueError):
+        threshold = request.session.get('threshold_overrides', {}).get(field, metric.min_threshold)
+
+    page = _card_project_page(request, view_mode, stage, field, threshold, sbu_filter, start_dt, end_dt, roll_start, roll_end)
+    return JsonResponse({'field': field, 'label': metric.label, 'stage': stage.lower(), 'threshold': threshold, **page})
+
+def card_recompute_view(request):
+    """ 
+        JSON: one dashboard card recomputed for a new threshold: its count and the first page of its 
+        project list (both from the card's stage set, so they always agree). The threshold 
+        is remembered as a session override, exactly like a dashboard reload with thresh_<stage>_<field>. 
+        Takes the card_projects_view params; threshold is required.
+    """
+    view_mode, _, _, start_dt, end_dt, sbu_filter, _, roll_start, roll_end = _get_request_params(request)
+    stage, field, metric = _resolve_card_metric(request, view_mode)
+    if metric is None:
+        return JsonResponse({'error': f"Unknown metric '{field}' for {view_mode} / {stage}."}, status=404)
+    try: threshold = float(request.GET['threshold'])
+    except (KeyError, ValueError):
+        return JsonResponse({'error': "A numeric threshold is required."}, status=400)
+
+    _save_threshold_override(request, field, threshold)
+
+    src_pre, src_post = _get_stage_sources(request, view_mode, sbu_filter, start_dt, end_dt, roll_start, roll_end)
+    stage_total, _ = _count_metric_hits(request, src_post if stage == 'Post' else src_pre, [], [])
+    page = _card_project_page(request, view_mode, stage, field, threshold, sbu_filter, start_dt, end_dt, roll_start, roll_end)
+
+    return JsonResponse({
+        'field': field, 'label': metric.label, 'stage': stage.lower(), 'threshold': threshold,
+        'param': f"thresh_{stage.lower()}_{field}", 'stage_total': stage_total, **page,
+    })
+
+def threshold_sweep(sorted_values):
+    """ 
+        Qualifying-project count at every distinct threshold of an ascending value array: 
+        count(t) = values >= t, found by binary search. Returns (thresholds, counts). 
+    """
+    thresholds = np.unique(sorted_values)
+    counts = len(sorted_values) - np.searchsorted(sorted_values, thresholds, side='left')
+    return thresholds, counts
+
+def card_sweep_view(request):
+    """ 
+        JSON: one dashboard card's count-vs-threshold curve for the current filters, so the 
+        threshold input can preview counts without reloading. Takes the card_projects_view params. 
+        Any threshold t counts like the first point at or above it (none: 0).
+    """
+    view_mode, _, _, start_dt, end_dt, sbu_filter, _, roll_start, roll_end = _get_request_params(request)
+    stage, field, metric = _resolve_card_metric(request, view_mode)
+    if metric is None:
+        return JsonResponse({'error': f"Unknown metric '{field}' for {view_mode} / {stage}."}, status=404)
+
+    src_pre, src_post = _get_stage_sources(request, view_mode, sbu_filter, start_dt, end_dt, roll_start, roll_end)
+    source = src_post if stage == 'Post' else src_pre
+    store = _get_project_store(request)
+    if store is not None:
+        values = store.sorted_values(field, source)
+    else:
+        values = np.sort(np.fromiter((v for v in source.values_list(field, flat=True) if v is not None), dtype=np.float64))
+
+    thresholds, counts = threshold_sweep(values)
+    return JsonResponse({
+        'field': field, 'label': metric.label, 'stage': stage.lower(), 'total': len(values),
+        'points': [[float(t), int(c)] for t, c in zip(thresholds, counts)],
+    })
+
 # ==============================================================================
 # SECTION 3: UPLOAD LOGIC (FULLY RESTORED)
 # ==============================================================================
 
 def upload_view(request):
+    """
+        Queues the uploaded file as a background ImportJob and returns at once.
+        The page then polls import_job_status_view until the job finishes.
+    """
     if request.method == 'POST':
         form = UploadFileForm(request.POST, request.FILES)
         if form.is_valid():
             try:
-                file = request.FILES['file']
-                xls = pd.ExcelFile(file)
-                sheet_map = {'sales': '', 'design': '', 'operation': ''}
-                
-                # Find sheets (Case insensitive)
-                for name in xls.sheet_names:
-                    lower = str(name).lower()
-                    if 'sales' in lower: sheet_map['sales'] = str(name)
-                    elif 'design' in lower: sheet_map['design'] = str(name)
-                    elif 'operation' in lower or 'ops' in lower: sheet_map['operation'] = str(name)
-
-                project_data_map = {}
-
-                # Helpers
-                def clean_str(val): 
-                    if pd.isnull(val): return ''
-                    s = str(val).strip()
-                    return '' if s.lower() == 'nan' else s
-
-                def parse_date(val): 
-                    return pd.to_datetime(val).date() if pd.notnull(val) else None
-
-                def clean_num(val):
-                    if pd.isnull(val): return 0.0
-                    try: return float(str(val).replace('%','').replace(',','').strip())
-                    except: return 0.0
-                
-                def get_clean_id(row_dict):
-                    for c in ['project code','code','lead id']:
-                        if c in row_dict and row_dict[c]:
-                            v = str(row_dict[c]).strip().upper()
-                            if v and v != 'NAN': return v.replace('.0','')
-                    return None
-
-                def process_sheet(sheet_name, sheet_type):
-                    if not sheet_name: return
-                    df = pd.read_excel(file, sheet_name=sheet_name)
-                    
-                    # 1. FORCE LOWERCASE HEADERS
-                    df.columns = [str(c).strip().lower() for c in df.columns]
-
-                    # 2. CALCULATED COLUMNS
-                    if sheet_type == 'design':
-                        if 'no key plans spaces' in df.columns and 'mapped spaces' in df.columns:
-                            df['key plans ratio'] = pd.to_numeric(df['no key plans spaces'], errors='coerce').fillna(0) / pd.to_numeric(df['mapped spaces'], errors='coerce').replace(0,1).fillna(0)
-                        if 'layouts' in df.columns and 'furniture layouts' in df.columns:
-                            df['other layouts'] = df['layouts'] - df['furniture layouts']
-                    
-                    if sheet_type == 'operation':
-                        ops_calcs = [
-                            ('wpr half week','wpr download weeks','weeks till date'), 
-                            ('manpower ratio','actual manpower','planned manpower'),
-                            ('dpr ratio','dpr added days','days till date'), 
-                            ('manpower day ratio','manpower added days','days till date')
-                        ]
-                        for t, n, d in ops_calcs:
-                            if n in df.columns and d in df.columns:
-                                df[t] = (pd.to_numeric(df[n], errors='coerce') / pd.to_numeric(df[d], errors='coerce').replace(0,1)).fillna(0)
-
-                    # 3. ROW ITERATION
-                    for _, row_series in df.iterrows():
-                        row = {k: v for k, v in row_series.items()}
-                        p_id = get_clean_id(row)
-                        if not p_id: continue
-
-                        if p_id not in project_data_map: 
-                            project_data_map[p_id] = {'project_code': p_id}
-                        
-                        # Metadata Mapping
-                        meta_config = {
-                            'project_name': ['project name', 'name'],
-                            'sbu':          ['sbu', 'region'],
-                            'stage':        ['stage', 'status'],
-                            'floors':       ['floors', 'no of floors'],
-                            'project_type': ['project type', 'type'],
-                            'lead_id':      ['lead id', 'lead', 'id'],
-
-                            'sales_head':   ['sales head', 's head'],
-                            'sales_lead':   ['sales lead', 's lead'],
-
-                            'design_dh':    ['dh', 'design head'],
-                            'design_dm':    ['dm', 'design lead', 'design manager'],
-                            'design_id':    ['id', 'design id'],
-                            'design_3d':    ['3d', '3d visualizer'],
-
-                            'ops_head':     ['cluster/bu head', 'ops head'],
-                            'ops_pm':       ['spm/pm', 'project manager', 'pm'],
-                            'ops_om':       ['som/om', 'ops manager', 'om'],
-                            'ops_ss':       ['ss', 'site supervisor'],
-                            'ops_mep':      ['mep'],
-                            'ops_csc':      ['csc']
-                        }
-
-                        for db_field, options in meta_config.items():
-                            for opt in options:
-                                if opt in row:
-                                    val = clean_str(row[opt])
-                                    if val: 
-                                        project_data_map[p_id][db_field] = val
-                                    break 
-
-                        # Dates
-                        date_map = {'login_date': 'project login date', 'start_date': 'project start date', 'end_date': 'project end date'}
-                        for db, xl in date_map.items():
-                            if xl in row:
-                                v = parse_date(row[xl])
-                                if v: project_data_map[p_id][db] = v
-
-                        # Metrics
-                        full_map = EXCEL_COL_MAP.copy()
-                        full_map.update({
-                            'Key Plans Ratio':'key_plans_ratio', 'Other Layouts':'other_layouts', 
-                            'WPR Half Week':'wpr_half_week', 'Manpower Ratio':'manpower_ratio', 
-                            'DPR Ratio':'dpr_ratio', 'Manpower Day Ratio':'manpower_day_ratio'
-                        })
-
-                        for xl_col, db_field in full_map.items():
-                            xl_lower = str(xl_col).strip().lower()
-                            if xl_lower in row:
-                                v = clean_num(row[xl_lower])
-                                if v != 0 or db_field not in project_data_map[p_id]:
-                                    project_data_map[p_id][db_field] = v
-
-                process_sheet(sheet_map['sales'], 'sales')
-                process_sheet(sheet_map['design'], 'design')
-                process_sheet(sheet_map['operation'], 'operation')
-
-                if project_data_map:
-                    Project.objects.all().delete()
-                    Project.objects.bulk_create([Project(**d) for d in project_data_map.values()])
-                    messages.success(request, f"Restored {len(project_data_map)} projects. Database updated.")
-                else:
-                    messages.error(request, "No valid project data found in file.")
-                
-                return redirect('dashboard')
-
+                job = enqueue_import(
+                    request.FILES['file'],
+                    mode=form.cleaned_data.get('mode') or 'upsert',
+                    retire_missing=form.cleaned_data.get('retire_missing', False),
+                )
             except Exception as e:
                 messages.error(request, f"Upload Failed: {str(e)}")
+            else:
+                if 'application/json' in request.headers.get('Accept', ''):
+                    return JsonResponse({'job_id': job.pk, 'status_url': reverse('import_job_status', args=[job.pk])}, status=202)
+                return redirect(f"{reverse('upload')}?job={job.pk}")
+        else:
+            messages.error(request, f"Upload Failed: {' '.join(e for errs in form.errors.values() for e in errs)}")
     else:
         form = UploadFileForm()
-    return render(request, 'core/upload.html', {'form': form})
+
+    job = None
+    if request.GET.get('job', '').isdigit():
+        job = ImportJob.objects.filter(pk=request.GET['job']).first()
+    return render(request, 'core/upload.html', {'form': form, 'job': job})
+
+def import_job_status_view(request, job_id):
+    """ 
+        Lightweight progress endpoint polled by the upload page. 
+    """
+    job = get_object_or_404(ImportJob, pk=job_id)
+    return JsonResponse(job_progress(job))
+
+@staff_member_required
+def response_cache_stats_view(request):
+    """ 
+        Hit / miss counters of the analytics page cache (this worker process). Staff only. 
+    """
+    return JsonResponse(response_cache_stats())
 
 def project_detail(request, pk):
     project = get_object_or_404(Project, pk=pk)
@@ -607,24 +838,30 @@ def project_detail(request, pk):
 # SECTION 4: EXPORTS & REPORTS (FIXED: SEPARATED SUMMARY & DETAILED)
 # ==============================================================================
 
+@condition(etag_func=analytics_etag('export_view'))
 def export_view(request):
     """ 
         Excel Export for Leadership Summary (Counts & %) 
     """
     return _handle_summary_report(request, is_excel=True)
 
+@condition(etag_func=analytics_etag('report_view'))
+@cache_analytics_page
 def report_view(request):
     """ 
         HTML Live View for Leadership Summary (Counts & %) 
     """
     return _handle_summary_report(request, is_excel=False)
 
+@condition(etag_func=analytics_etag('export_detailed_view'))
 def export_detailed_view(request):
     """ 
         Excel Export for Detailed Project List (Rows & Columns) 
     """
     return _handle_detailed_report(request, is_excel=True)
 
+@condition(etag_func=analytics_etag('report_detailed_view'))
+@cache_analytics_page
 def report_detailed_view(request):
     """ 
         HTML Live View for Detailed Project List (Rows & Columns) 
@@ -636,27 +873,22 @@ def report_detailed_view(request):
 def _handle_summary_report(request, is_excel=False):
     threshold_map = _handle_threshold_session(request) 
     view_mode, _, _, start_dt, end_dt, sbu_filter, role_filter, roll_start, roll_end = _get_request_params(request)
-    projects = Project.objects.filter(sbu__in=sbu_filter).exclude(project_code="PS-02AUG23-BB1_TEST-SOMERSET-01")
-    projects = _apply_people_filters(projects, view_mode, request)
-    qs_pre, qs_post = _get_stage_querysets(view_mode, projects, start_dt, end_dt, roll_start, roll_end)
+    src_pre, src_post = _get_stage_sources(request, view_mode, sbu_filter, start_dt, end_dt, roll_start, roll_end)
 
     pre_metrics_db = _fetch_metrics_from_db(view_mode, 'Pre', role_filter, threshold_map)
     post_metrics_db = _fetch_metrics_from_db(view_mode, 'Post', role_filter, threshold_map)
 
-    def generate_summary_df(queryset, metrics_list, prefix):
-        total = queryset.count()
+    def generate_summary_df(source, metrics_list, prefix):
+        thresholds = [m['def'] for m in metrics_list]
+        total, counts = _count_metric_hits(request, source, metrics_list, thresholds)
         data = [{"Metric Name": "TOTAL PROJECTS", "Threshold": "-", "Value": total, "%": "-"}]
-        for m in metrics_list:
-            threshold = m['def']
-            param_name = f"thresh_{prefix}_{m['field']}"
-            user_input = request.GET.get(param_name)
-            count = queryset.filter(**{f"{m['field']}__gte": threshold}).count()
+        for m, threshold, count in zip(metrics_list, thresholds, counts):
             pct = round((count / total * 100), 1) if total > 0 else 0.0
             data.append({"Metric Name": m['label'], "Category": m['success_cat'], "Threshold": threshold, "Value": count, "%": f"{pct}%"})
         return pd.DataFrame(data)
 
-    df_pre = generate_summary_df(qs_pre, pre_metrics_db, 'pre') if view_mode != 'Operations' else pd.DataFrame()
-    df_post = generate_summary_df(qs_post, post_metrics_db, 'post')
+    df_pre = generate_summary_df(src_pre, pre_metrics_db, 'pre') if view_mode != 'Operations' else pd.DataFrame()
+    df_post = generate_summary_df(src_post, post_metrics_db, 'post')
 
     if is_excel:
         buffer = BytesIO()
@@ -699,7 +931,8 @@ def _handle_detailed_report(request, is_excel=False):
         metric_fields = [m['field'] for m in metrics_list]
         
         fetch_fields = std_cols + role_cols + metric_fields
-        data = list(queryset.values(*fetch_fields))
+        # Import order, whichever index serves the filter
+        data = list(queryset.order_by('pk').values(*fetch_fields))
         
         if not data: return pd.DataFrame()
         df = pd.DataFrame(data)
@@ -753,7 +986,7 @@ def _handle_detailed_report(request, is_excel=False):
         context = {
             'view_mode': view_mode, 'start_date': str(start_dt), 'end_date': str(end_dt),
 
-            'sbus': sorted([s for s in Project.objects.values_list('sbu', flat=True).distinct() if s]) or ['North', 'South', 'West', 'Central'],
+            'sbus': _get_filter_options(request)['sbus'] or ['North', 'South', 'West', 'Central'],
             'selected_sbus': sbu_filter,
             'current_role': role_filter,
             'people_opts': people_opts, 
@@ -784,7 +1017,7 @@ def project_scorecard_view(request, project_code):
 
     search_term = raw_role_param.split(' - ')[-1] if ' - ' in raw_role_param else raw_role_param
     
-    user_group = UserGroup.objects.filter(name__icontains=search_term).first()
+    user_group = get_config().find_group(search_term)
     all_groups = UserGroup.objects.select_related('department').order_by('department__name', 'name')
     
     if not user_group:
@@ -793,7 +1026,7 @@ def project_scorecard_view(request, project_code):
             'all_groups': all_groups, 'selected_role_full': raw_role_param 
         })
 
-    valid_metrics, stage_totals = _get_scoring_engine_context(user_group, threshold_map)
+    valid_metrics, stage_totals = scoring_context(user_group, threshold_map)
     project_score, metric_stage_key = _calculate_project_score(project, valid_metrics, stage_totals)
     
     total_factor_sum = stage_totals.get(metric_stage_key, 0)
@@ -910,12 +1143,12 @@ def project_scorecard_view(request, project_code):
         'metric_role': raw_role_param,
     })
 
+@cache_analytics_page
 def leaderboard_view(request):
     threshold_map = _handle_threshold_session(request)
     _, start_str, end_str, start_dt, end_dt, sbu_filter, _, _, _ = _get_request_params(request)
     
-    all_sbu_options = list(Project.objects.exclude(sbu__isnull=True).exclude(sbu="").values_list('sbu', flat=True).distinct())
-    all_sbu_options.sort()
+    all_sbu_options = list(_get_filter_options(request)['sbus'])
 
     all_role_keys = sorted(ROLE_CONFIG.keys())
 
@@ -927,30 +1160,27 @@ def leaderboard_view(request):
     if not config: return render(request, 'core/leaderboard.html', {'error': "Role not found."})
 
     project_field = config['field']
-    user_group = UserGroup.objects.filter(name__icontains=simple_role_name).first()
+    user_group = get_config().find_group(simple_role_name)
     if not user_group: return render(request, 'core/leaderboard.html', {'error': "User Group config missing."})
 
-    projects = _fetch_projects_filtered(sbu_filter, start_dt, end_dt, project_field)
-    valid_metrics, stage_totals = _get_scoring_engine_context(user_group, threshold_map)
+    valid_metrics, stage_totals = scoring_context(user_group, threshold_map)
+    scored = _score_projects(request, user_group, sbu_filter, start_dt, end_dt, project_field, valid_metrics, stage_totals)
 
     leaderboard = {}
-    for proj in projects:
-        if not proj.project_code or not str(proj.project_code).strip(): continue
-        user_email = getattr(proj, project_field)
+    for user_email, project_code, project_name, sbu, project_score, stage_name in scored:
+        if not project_code or not str(project_code).strip(): continue
         if not user_email: continue
         user_key = str(user_email).strip().lower()
         
         if user_key not in leaderboard:
             leaderboard[user_key] = {'name': user_email, 'total_score': 0, 'projects': 0, 'breakdown': []}
 
-        project_score, stage_name = _calculate_project_score(proj, valid_metrics, stage_totals)
-
         leaderboard[user_key]['total_score'] += project_score
         leaderboard[user_key]['projects'] += 1
         leaderboard[user_key]['breakdown'].append({
-            'project_name': proj.project_name or proj.project_code,
-            'code': proj.project_code, 'stage': stage_name,
-            'sbu': proj.sbu, 'score': project_score
+            'project_name': project_name or project_code,
+            'code': project_code, 'stage': stage_name,
+            'sbu': sbu, 'score': project_score
         })
 
     sorted_leaderboard = sorted(leaderboard.values(), key=lambda x: x['total_score'], reverse=True)
@@ -974,11 +1204,11 @@ def leaderboard_view(request):
     }
     return render(request, 'core/leaderboard.html', context)
 
+@cache_analytics_page
 def leaderboard_summary_view(request):
     threshold_map = _handle_threshold_session(request)
     _, start_str, end_str, start_dt, end_dt, sbu_filter, _, _, _ = _get_request_params(request)
-    all_sbu_options = list(Project.objects.exclude(sbu__isnull=True).exclude(sbu="").values_list('sbu', flat=True).distinct())
-    all_sbu_options.sort()
+    all_sbu_options = list(_get_filter_options(request)['sbus'])
     sbu_filter = request.GET.getlist('sbu') or all_sbu_options or ['North', 'South', 'East', 'Central']
 
     hall_of_fame = defaultdict(dict)
@@ -990,24 +1220,11 @@ def leaderboard_summary_view(request):
         link_param = config['link']
         
         search_term = role_name.replace("Design ", "").replace("Ops ", "").replace("Sales ", "")
-        user_group = UserGroup.objects.filter(name__icontains=search_term).first()
+        user_group = get_config().find_group(search_term)
         if not user_group: continue
 
-        projects = _fetch_projects_filtered(sbu_filter, start_dt, end_dt, project_field)
-        valid_metrics, stage_totals = _get_scoring_engine_context(user_group, threshold_map)
-
-        role_leaderboard = {}
-        for proj in projects:
-            user_email = getattr(proj, project_field)
-            if not user_email: continue
-            user_key = str(user_email).strip().lower()
-            if user_key not in role_leaderboard:
-                role_leaderboard[user_key] = {'name': user_email, 'total_score': 0}
-
-            score, _ = _calculate_project_score(proj, valid_metrics, stage_totals)
-            role_leaderboard[user_key]['total_score'] += score
-
-        sorted_users = sorted(role_leaderboard.values(), key=lambda x: x['total_score'], reverse=True)
+        valid_metrics, stage_totals = scoring_context(user_group, threshold_map)
+        sorted_users = _leaderboard_totals(request, user_group, sbu_filter, start_dt, end_dt, project_field, valid_metrics, stage_totals)
         top_two = sorted_users[:2]
         for user in top_two:
             user['total_score'] = int(round(user['total_score'], 0))
@@ -1054,6 +1271,7 @@ def _parse_comparison_ranges(request, default_start_dt, default_end_dt):
         
     return date_ranges
 
+@cache_analytics_page
 def comparison_view(request):
     threshold_map = _handle_threshold_session(request)
     
@@ -1061,7 +1279,7 @@ def comparison_view(request):
     view_mode, _, _, default_start_dt, default_end_dt, sbu_filter, role_filter, _, _ = _get_request_params(request)
     people_opts, selected_filters = _get_dropdown_context(request)
 
-    all_departments = Department.objects.values_list('name', flat=True).order_by('name')
+    all_departments = get_config().departments
     all_role_keys = sorted(ROLE_CONFIG.keys())
     grouped_roles = group_roles_by_dept(all_role_keys)
     
@@ -1069,31 +1287,28 @@ def comparison_view(request):
     date_ranges = _parse_comparison_ranges(request, default_start_dt, default_end_dt)
     range_labels = [f"{r['start'].strftime('%d %b %y')} - {r['end'].strftime('%d %b %y')}" for r in date_ranges]
     
-    # 2. Base Query (Filtered globally once for speed)
-    base_projects = Project.objects.filter(sbu__in=sbu_filter).exclude(project_code="PS-02AUG23-BB1_TEST-SOMERSET-01")
-    base_projects = _apply_people_filters(base_projects, view_mode, request)
-    
     pre_metrics = _fetch_metrics_from_db(view_mode, 'Pre', role_filter, threshold_map)
     post_metrics = _fetch_metrics_from_db(view_mode, 'Post', role_filter, threshold_map)
+
+    # 2. Pre/Post sets of EACH date panel
+    # CRITICAL: Dynamically shift the 6-month rolling window for historical panels!
+    panel_sources = [
+        _get_stage_sources(request, view_mode, sbu_filter, r['start'], r['end'],
+                           r['start'] - timedelta(days=180), r['end'] + timedelta(days=240))
+        for r in date_ranges
+    ]
     
     def build_comparison_data(metrics_list, stage_name):
+        # One count pass per panel covering every metric: panel_counts[panel][metric]
+        thresholds = [m['def'] for m in metrics_list]
+        panel_counts = [
+            _count_metric_hits(request, src_pre if stage_name == 'Pre' else src_post, metrics_list, thresholds)[1]
+            for src_pre, src_post in panel_sources
+        ]
+
         data = []
-        for m in metrics_list:
-            counts = []
-            
-            # Count the metric for EACH date panel
-            for r in date_ranges:
-                r_start, r_end = r['start'], r['end']
-                
-                # CRITICAL: Dynamically shift the 6-month rolling window for historical panels!
-                tmp_roll_start = r_start - timedelta(days=180)
-                tmp_roll_end = r_end + timedelta(days=240)
-                
-                qs_pre, qs_post = _get_stage_querysets(view_mode, base_projects, r_start, r_end, tmp_roll_start, tmp_roll_end)
-                qs = qs_pre if stage_name == 'Pre' else qs_post
-                
-                count = qs.filter(**{f"{m['field']}__gte": m['def']}).count()
-                counts.append(count)
+        for m_idx, m in enumerate(metrics_list):
+            counts = [c[m_idx] for c in panel_counts]
             
             # Calculate Deltas (Comparing Panel N to Panel N+1)
             deltas = []
@@ -1139,7 +1354,7 @@ def comparison_view(request):
     
     context = {
         'view_mode': view_mode,
-        'sbus': sorted([s for s in Project.objects.values_list('sbu', flat=True).distinct() if s]) or ['North', 'South', 'West', 'Central'],
+        'sbus': _get_filter_options(request)['sbus'] or ['North', 'South', 'West', 'Central'],
         'selected_sbus': sbu_filter,
         'current_role': role_filter,
         'people_opts': people_opts, 